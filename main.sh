@@ -1 +1 @@
-python3 src/htmlnode.py
\ No newline at end of file
+python3 src/main.py build content public
\ No newline at end of file
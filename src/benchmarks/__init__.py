@@ -0,0 +1,17 @@
+# Benchmarks for the parser, renderer and site build. Run them from src/:
+#
+#     python3 -m benchmarks [name ...] [--json results.json]
+#
+# Each benchmark prints a table and returns its numbers, which --json
+# collects into one file so runs can be compared.
+import os
+import timeit
+
+
+def best_time(func, repeat=5):
+    return min(timeit.repeat(func, number=1, repeat=repeat))
+
+def write_file(path, text):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(text)
@@ -0,0 +1,71 @@
+import argparse
+import json
+import platform
+import sys
+
+from benchmarks.blocks import bench_classify, bench_code_blocks
+from benchmarks.cache import bench_parse_cache
+from benchmarks.inline import bench_links, bench_long_paragraph, bench_text_nodes
+from benchmarks.large_file import bench_large_file
+from benchmarks.render import (
+    bench_escaping,
+    bench_fused_render,
+    bench_node_memory,
+    bench_render_tree,
+    bench_shared_nav,
+)
+from benchmarks.site import bench_template_deps, bench_templates, bench_watch_rebuild
+from benchmarks.stages import bench_stages
+
+BENCHMARKS = {
+    "stages": bench_stages,
+    "links": bench_links,
+    "text_nodes": bench_text_nodes,
+    "long_paragraph": bench_long_paragraph,
+    "render_tree": bench_render_tree,
+    "node_memory": bench_node_memory,
+    "fused_render": bench_fused_render,
+    "escaping": bench_escaping,
+    "shared_nav": bench_shared_nav,
+    "classify": bench_classify,
+    "code_blocks": bench_code_blocks,
+    "template_deps": bench_template_deps,
+    "templates": bench_templates,
+    "watch_rebuild": bench_watch_rebuild,
+    "large_file": bench_large_file,
+    "parse_cache": bench_parse_cache,
+}
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python3 -m benchmarks", description="Run the benchmarks")
+    parser.add_argument("names", nargs="*", metavar="name",
+                        help=f"benchmarks to run (default: all of {', '.join(BENCHMARKS)})")
+    parser.add_argument("--json", dest="json_path", help="also write the results to this JSON file")
+    parser.add_argument("--size", type=int, default=1000000, help="characters of generated corpus")
+    parser.add_argument("--seed", type=int, default=0, help="seed for the generated corpus")
+    parser.add_argument("--repeat", type=int, default=3, help="runs per timing; the best is kept")
+    parser.add_argument("--file-size", type=int, default=500, help="megabytes of generated document for large_file")
+    options = parser.parse_args(argv)
+    unknown = [name for name in options.names if name not in BENCHMARKS]
+    if unknown:
+        parser.error(f"unknown benchmark: {', '.join(unknown)}")
+
+    results = {}
+    for name in options.names or BENCHMARKS:
+        print(f"== {name} ==")
+        results[name] = BENCHMARKS[name](options)
+
+    if options.json_path:
+        report = {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "options": {"size": options.size, "seed": options.seed, "repeat": options.repeat,
+                        "file_size": options.file_size},
+            "results": results,
+        }
+        with open(options.json_path, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
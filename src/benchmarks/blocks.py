@@ -0,0 +1,68 @@
+from benchmarks import best_time
+from markdown_parser import (
+    block_to_block_type,
+    classify_blocks,
+    markdown_to_blocks,
+    markdown_to_html,
+    markdown_to_html_node,
+    parse_block,
+    render_block,
+)
+
+
+def mixed_blocks(count):
+    kinds = [
+        "## Section heading",
+        "```python\nprint('hello')\nprint('world')\n```",
+        "> quoted line one\n> quoted line two\n> quoted line three",
+        "- first item\n- second item\n- third item\n- fourth item",
+        "1. first\n2. second\n3. third\n4. fourth\n5. fifth",
+        "A plain paragraph with **bold** text\nthat wraps onto a second line.",
+        "1. starts like a list\n- but turns into a paragraph",
+    ]
+    return [kinds[i % len(kinds)] for i in range(count)]
+
+def bench_classify(options):
+    blocks = mixed_blocks(70000)
+    total = best_time(lambda: classify_blocks(blocks))
+    print(f"{len(blocks)} blocks in {total:.6f}s, {total / len(blocks) * 1e9:.0f} ns/block")
+    return {"blocks": len(blocks), "total_s": total, "ns_per_block": total / len(blocks) * 1e9}
+
+def code_page(size):
+    # A page that is a short intro and then one fenced block of about size
+    # characters of YAML-like config, with a few characters to escape.
+    line = 'key_{i}: "value <{i}> & more"  # _not_ **inline** `markup`'
+    lines = []
+    length = 0
+    i = 0
+    while length < size:
+        lines.append(line.format(i=i))
+        length += len(lines[-1]) + 1
+        i += 1
+    return "# Vendored config\n\nThe file as shipped:\n\n```yaml\n" + "\n".join(lines) + "\n```"
+
+def bench_code_blocks(options):
+    # Each stage of turning a page holding about 10 MB of code (ten times
+    # --size) into HTML. The code block's stages should run at memory speed,
+    # with "line split" showing the cost of the per-line handling they skip.
+    markdown = code_page(options.size * 10)
+    block = markdown_to_blocks(markdown)[-1]
+    block_type = block_to_block_type(block)
+    stages = {
+        "split blocks": lambda: markdown_to_blocks(markdown),
+        "classify": lambda: block_to_block_type(block),
+        "parse": lambda: parse_block(block, block_type),
+        "render": lambda: render_block(block),
+        "line split": lambda: "\n".join(block.splitlines()[1:-1]),
+        "page html": lambda: markdown_to_html(markdown),
+        "page tree": lambda: markdown_to_html_node(markdown).to_html(),
+    }
+    megabytes = len(markdown) / 2**20
+    print(f"{megabytes:.1f} MB page, {len(block) / 2**20:.1f} MB code block")
+    print(f"{'stage':>12} {'seconds':>10} {'MB/s':>10}")
+    results = {"page_chars": len(markdown)}
+    for stage, func in stages.items():
+        seconds = best_time(func, options.repeat)
+        print(f"{stage:>12} {seconds:>10.4f} {megabytes / seconds:>10.0f}")
+        results[stage] = seconds
+    return results
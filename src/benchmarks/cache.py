@@ -0,0 +1,72 @@
+import os
+import tempfile
+
+from benchmarks import best_time
+from benchmarks.corpus import generate_corpus
+from markdown_parser import markdown_to_blocks, markdown_to_html_node, parse_document, render_parsed
+from parse_cache import ParseCache
+
+
+def split_pages(markdown, page_size=5000):
+    # Cuts the corpus at block boundaries into pages of roughly page_size.
+    pages = []
+    blocks = []
+    length = 0
+    for block in markdown_to_blocks(markdown):
+        blocks.append(block)
+        length += len(block)
+        if length >= page_size:
+            pages.append("\n\n".join(blocks))
+            blocks = []
+            length = 0
+    if blocks:
+        pages.append("\n\n".join(blocks))
+    return pages
+
+def directory_size(path):
+    return sum(os.path.getsize(os.path.join(root, name)) for root, _, names in os.walk(path) for name in names)
+
+def bench_parse_cache(options):
+    # Parsing every page against loading it from a ParseCache filled by an
+    # earlier build. Each load uses a fresh ParseCache, as a new build
+    # process would; the entries are in the OS page cache after the first
+    # run, so this is the warm-disk case.
+    pages = split_pages(generate_corpus(options.size, options.seed))
+    source_bytes = sum(len(page.encode("utf-8")) for page in pages)
+    print(f"{len(pages)} pages, {source_bytes / 2**20:.1f} MB of markdown")
+    print(f"{'form':>8} {'parse (s)':>10} {'load (s)':>10} {'speedup':>8} {'cache MB':>9}")
+
+    forms = {
+        "parsed": (parse_document, ParseCache.get_parsed),
+        "tree": (markdown_to_html_node, ParseCache.get_html_node),
+    }
+    results = {"pages": len(pages), "source_bytes": source_bytes}
+    for form, (parse, load) in forms.items():
+        with tempfile.TemporaryDirectory() as root:
+            filled = ParseCache(root)
+            for page in pages:
+                load(filled, page)
+            parse_seconds = best_time(lambda: [parse(page) for page in pages], options.repeat)
+
+            def cold_load():
+                cache = ParseCache(root)
+                loaded = [load(cache, page) for page in pages]
+                assert cache.misses == 0
+                return loaded
+
+            load_seconds = best_time(cold_load, options.repeat)
+            cache_bytes = directory_size(root)
+        print(f"{form:>8} {parse_seconds:>10.3f} {load_seconds:>10.3f} {parse_seconds / load_seconds:>7.1f}x "
+              f"{cache_bytes / 2**20:>9.1f}")
+        results[form] = {"parse_seconds": parse_seconds, "load_seconds": load_seconds, "cache_bytes": cache_bytes}
+
+    with tempfile.TemporaryDirectory() as root:
+        filled = ParseCache(root)
+        for page in pages:
+            filled.get_parsed(page)
+        render_seconds = best_time(lambda: [render_parsed(parse_document(page)) for page in pages], options.repeat)
+        cached_seconds = best_time(lambda: [render_parsed(ParseCache(root).get_parsed(page)) for page in pages],
+                                   options.repeat)
+    print(f"{'html':>8} {render_seconds:>10.3f} {cached_seconds:>10.3f} {render_seconds / cached_seconds:>7.1f}x")
+    results["page_html"] = {"parse_seconds": render_seconds, "load_seconds": cached_seconds}
+    return results
@@ -0,0 +1,74 @@
+import random
+
+# Relative weights; they don't need to add up to anything in particular.
+DEFAULT_BLOCK_MIX = {
+    "paragraph": 50,
+    "heading": 10,
+    "unordered_list": 12,
+    "ordered_list": 8,
+    "quote": 8,
+    "code": 12,
+}
+DEFAULT_INLINE_MIX = {
+    "text": 80,
+    "bold": 5,
+    "italic": 5,
+    "code": 3,
+    "link": 5,
+    "image": 2,
+}
+
+WORDS = (
+    "static", "site", "generator", "markdown", "parser", "block", "inline",
+    "render", "node", "tree", "page", "build", "cache", "python", "text",
+    "template", "layout", "content", "output", "stream",
+)
+
+def inline_text(rng, inline_mix, word_count):
+    spans = []
+    for kind in rng.choices(list(inline_mix), list(inline_mix.values()), k=word_count):
+        word = rng.choice(WORDS)
+        if kind == "bold":
+            spans.append(f"**{word}**")
+        elif kind == "italic":
+            spans.append(f"_{word}_")
+        elif kind == "code":
+            spans.append(f"`{word}`")
+        elif kind == "link":
+            spans.append(f"[{word}](https://example.com/{word})")
+        elif kind == "image":
+            spans.append(f"![{word}](images/{word}.png)")
+        else:
+            spans.append(word)
+    return " ".join(spans)
+
+def generate_block(rng, kind, inline_mix):
+    if kind == "heading":
+        return "#" * rng.randint(1, 6) + " " + inline_text(rng, inline_mix, rng.randint(2, 8))
+    if kind == "unordered_list":
+        return "\n".join("- " + inline_text(rng, inline_mix, rng.randint(3, 10)) for _ in range(rng.randint(2, 8)))
+    if kind == "ordered_list":
+        return "\n".join(f"{i}. " + inline_text(rng, inline_mix, rng.randint(3, 10)) for i in range(1, rng.randint(2, 8) + 1))
+    if kind == "quote":
+        return "\n".join("> " + inline_text(rng, inline_mix, rng.randint(5, 15)) for _ in range(rng.randint(1, 4)))
+    if kind == "code":
+        lines = [f"{rng.choice(WORDS)} = {rng.choice(WORDS)}({rng.randint(0, 99)})" for _ in range(rng.randint(2, 12))]
+        return "```python\n" + "\n".join(lines) + "\n```"
+    return "\n".join(inline_text(rng, inline_mix, rng.randint(8, 16)) for _ in range(rng.randint(1, 4)))
+
+def generate_corpus(size=1000000, seed=0, block_mix=None, inline_mix=None):
+    # Builds a markdown document of at least `size` characters. The same
+    # arguments always give the same document, and every document parses.
+    rng = random.Random(seed)
+    block_mix = block_mix or DEFAULT_BLOCK_MIX
+    inline_mix = inline_mix or DEFAULT_INLINE_MIX
+    kinds = list(block_mix)
+    weights = list(block_mix.values())
+
+    blocks = []
+    length = 0
+    while length < size:
+        block = generate_block(rng, rng.choices(kinds, weights)[0], inline_mix)
+        blocks.append(block)
+        length += len(block) + 2
+    return "\n\n".join(blocks)
@@ -0,0 +1,75 @@
+import tracemalloc
+
+from benchmarks import best_time
+from benchmarks.corpus import generate_corpus
+from markdown_parser import (
+    block_inline_texts,
+    classify_blocks,
+    markdown_to_blocks,
+    split_nodes_image,
+    split_nodes_link,
+    text_to_textnodes,
+)
+from textnode import TextNode, TextType, text_nodes_to_html
+
+
+def bench_links(options):
+    # Time per link should stay flat as the paragraph grows.
+    results = {}
+    print(f"{'count':>8} {'images (s)':>12} {'links (s)':>12} {'us/item':>10}")
+    for count in (10, 100, 1000, 10000):
+        image_text = " ".join(f"see ![pic {i}](img/{i}.png)" for i in range(count))
+        link_text = " ".join(f"see [page {i}](https://example.com/{i})" for i in range(count))
+        image_nodes = [TextNode(image_text, TextType.TEXT)]
+        link_nodes = [TextNode(link_text, TextType.TEXT)]
+        image_time = best_time(lambda: split_nodes_image(image_nodes))
+        link_time = best_time(lambda: split_nodes_link(link_nodes))
+        per_item = max(image_time, link_time) / count * 1e6
+        print(f"{count:>8} {image_time:>12.6f} {link_time:>12.6f} {per_item:>10.3f}")
+        results[count] = {"images_s": image_time, "links_s": link_time}
+    return results
+
+def retained_bytes(func):
+    tracemalloc.start()
+    result = func()
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del result
+    return size
+
+def bench_text_nodes(options):
+    # Inline parsing of every block in the corpus, keeping the node lists, with
+    # copied text against offsets into the block text and TextNodeArrays, and
+    # then rendering what was kept.
+    blocks = markdown_to_blocks(generate_corpus(options.size, options.seed))
+    texts = [text for block, block_type in zip(blocks, classify_blocks(blocks))
+             for text in block_inline_texts(block, block_type)]
+    results = {}
+    print(f"{'nodes':>8} {'seconds':>10} {'retained MB':>12} {'render (s)':>11}")
+    for label, kwargs in (("copied", {}), ("offsets", {"offsets": True}), ("columnar", {"columnar": True})):
+        parse = lambda: [text_to_textnodes(text, **kwargs) for text in texts]
+        seconds = best_time(parse, options.repeat)
+        retained = retained_bytes(parse)
+        parsed = parse()
+        render_seconds = best_time(lambda: [text_nodes_to_html(nodes) for nodes in parsed], options.repeat)
+        print(f"{label:>8} {seconds:>10.4f} {retained / 2**20:>12.2f} {render_seconds:>11.4f}")
+        results[label] = {"seconds": seconds, "retained_bytes": retained, "render_seconds": render_seconds}
+    return results
+
+def bench_long_paragraph(options):
+    # One paragraph of about options.size characters holding ~100k inline
+    # spans per megabyte, as a list of TextNodes against a TextNodeArray.
+    span = "word **bold {i}** and _it_ [link](https://example.com/{j}) `c` "
+    text = "".join(span.format(i=i, j=i % 50) for i in range(options.size // len(span)))
+    results = {}
+    print(f"{'nodes':>8} {'spans':>9} {'seconds':>10} {'retained MB':>12} {'render (s)':>11}")
+    for label, columnar in (("list", False), ("columnar", True)):
+        parse = lambda: text_to_textnodes(text, columnar=columnar)
+        seconds = best_time(parse, options.repeat)
+        retained = retained_bytes(parse)
+        nodes = parse()
+        render_seconds = best_time(lambda: text_nodes_to_html(nodes), options.repeat)
+        print(f"{label:>8} {len(nodes):>9} {seconds:>10.4f} {retained / 2**20:>12.2f} {render_seconds:>11.4f}")
+        results[label] = {"spans": len(nodes), "seconds": seconds, "retained_bytes": retained,
+                          "render_seconds": render_seconds}
+    return results
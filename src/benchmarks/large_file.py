@@ -0,0 +1,63 @@
+import os
+import subprocess
+import sys
+import tempfile
+
+from benchmarks.corpus import generate_corpus
+
+SRC_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Each reader runs in a fresh interpreter so ru_maxrss is its own peak alone.
+# Every block is decoded and classified, like the first stage of a build.
+READERS = {
+    "baseline": "blocks = []",
+    "read": (
+        "with open(path, encoding='utf-8') as f:\n"
+        "    blocks = markdown_to_blocks(f.read())"
+    ),
+    "mapped": "blocks = iter_mapped_blocks(path)",
+}
+
+CHILD = """
+import resource, sys, time
+sys.path.insert(0, {src_dir!r})
+from markdown_parser import block_to_block_type, iter_mapped_blocks, markdown_to_blocks
+path = {path!r}
+start = time.perf_counter()
+{reader}
+count = 0
+for block in blocks:
+    block_to_block_type(block)
+    count += 1
+print(count, time.perf_counter() - start, resource.getrusage(resource.RUSAGE_SELF).ru_maxrss)
+"""
+
+def write_large_document(path, size, seed=0):
+    # Repeats one generated chunk rather than generating the whole document,
+    # which would take far longer than the reads being measured.
+    chunk = generate_corpus(min(size, 1000000), seed).encode("utf-8") + b"\n\n"
+    written = 0
+    with open(path, "wb") as f:
+        while written < size:
+            f.write(chunk)
+            written += len(chunk)
+    return written
+
+def run_reader(path, reader):
+    code = CHILD.format(src_dir=SRC_DIR, path=path, reader=READERS[reader])
+    output = subprocess.run([sys.executable, "-c", code], check=True, capture_output=True, text=True).stdout
+    count, seconds, max_rss_kb = output.split()
+    return int(count), float(seconds), int(max_rss_kb) * 1024
+
+def bench_large_file(options):
+    with tempfile.TemporaryDirectory() as root:
+        path = os.path.join(root, "large.md")
+        size = write_large_document(path, options.file_size * 1024 * 1024, options.seed)
+        print(f"{size / 2**20:.0f} MB document")
+        print(f"{'reader':>10} {'blocks':>10} {'seconds':>10} {'peak RSS MB':>12}")
+        results = {"bytes": size}
+        for reader in READERS:
+            count, seconds, peak = run_reader(path, reader)
+            print(f"{reader:>10} {count:>10} {seconds:>10.3f} {peak / 2**20:>12.1f}")
+            results[reader] = {"blocks": count, "seconds": seconds, "peak_rss_bytes": peak}
+    return results
@@ -0,0 +1,204 @@
+import contextlib
+import operator
+import statistics
+import sys
+import tracemalloc
+
+from benchmarks import best_time
+from benchmarks.corpus import generate_corpus
+import htmlnode
+import markdown_parser
+import textnode
+from htmlnode import LeafNode, ParentNode, RawHTMLNode
+from markdown_parser import (
+    build_block_html,
+    build_block_node,
+    classify_blocks,
+    markdown_to_blocks,
+    markdown_to_html,
+    markdown_to_html_node,
+    parse_block,
+)
+from textnode import TextNode, TextType, text_node_to_html_node, text_nodes_to_html
+
+
+def recursive_to_html(node):
+    # The pre-iterative ParentNode.to_html, kept as a baseline.
+    if isinstance(node, ParentNode):
+        child_string = "".join(recursive_to_html(child) for child in node.children)
+        return f"<{node.tag}{node.props_to_html()}>{child_string}</{node.tag}>"
+    return node.to_html()
+
+def wide_tree(width, fanout=100):
+    rows = [ParentNode("ul", [LeafNode("li", f"item {i}") for i in range(fanout)])
+            for _ in range(width // fanout)]
+    return ParentNode("div", rows)
+
+def deep_tree(depth):
+    node = LeafNode("b", "leaf")
+    for _ in range(depth):
+        node = ParentNode("div", [node])
+    return node
+
+def bench_render_tree(options):
+    results = {}
+    print(f"{'tree':>14} {'recursive (s)':>14} {'iterative (s)':>14}")
+    trees = [
+        ("wide 10000", wide_tree(10000)),
+        ("wide 100000", wide_tree(100000)),
+        ("deep 300", deep_tree(300)),
+        ("deep 100000", deep_tree(100000)),
+    ]
+    for name, tree in trees:
+        try:
+            recursive = best_time(lambda: recursive_to_html(tree))
+        except RecursionError:
+            recursive = None
+        iterative = best_time(tree.to_html)
+        recursive_column = "RecursionError" if recursive is None else f"{recursive:.6f}"
+        print(f"{name:>14} {recursive_column:>14} {iterative:>14.6f}")
+        results[name] = {"recursive_s": recursive, "iterative_s": iterative}
+    return results
+
+def bytes_per_node(factory, count=100000):
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    nodes = [factory(i) for i in range(count)]
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    # Don't count the list holding the nodes.
+    return (after - before - sys.getsizeof(nodes)) / len(nodes)
+
+def bench_node_memory(options):
+    # Text and tag strings are shared so only the node objects are measured.
+    text = "shared text"
+    leaf = LeafNode("b", text)
+    factories = [
+        ("TextNode", lambda i: TextNode(text, TextType.TEXT)),
+        ("LeafNode", lambda i: LeafNode("b", text)),
+        ("LeafNode+props", lambda i: LeafNode("a", text, {"href": text})),
+        ("ParentNode", lambda i: ParentNode("p", [leaf])),
+    ]
+    results = {}
+    print(f"{'node':>16} {'bytes/node':>12}")
+    for name, factory in factories:
+        results[name] = bytes_per_node(factory)
+        print(f"{name:>16} {results[name]:>12.1f}")
+    return results
+
+def bench_fused_render(options):
+    # The match-statement path (a LeafNode per inline node, then to_html)
+    # against rendering TextNodes straight to strings.
+    markdown = generate_corpus(options.size, options.seed)
+    blocks = markdown_to_blocks(markdown)
+    parsed_blocks = [(block, block_type, parse_block(block, block_type))
+                     for block, block_type in zip(blocks, classify_blocks(blocks))]
+    inline_lists = [nodes for _, _, inline_nodes in parsed_blocks for nodes in inline_nodes]
+    cases = [
+        ("inline nodes",
+         lambda: ["".join([text_node_to_html_node(node).to_html() for node in nodes]) for nodes in inline_lists],
+         lambda: [text_nodes_to_html(nodes) for nodes in inline_lists]),
+        ("blocks",
+         lambda: [build_block_node(*parsed_block).to_html() for parsed_block in parsed_blocks],
+         lambda: [build_block_html(*parsed_block) for parsed_block in parsed_blocks]),
+        ("document",
+         lambda: markdown_to_html_node(markdown).to_html(),
+         lambda: markdown_to_html(markdown)),
+    ]
+    results = {}
+    print(f"{'case':>14} {'nodes (s)':>10} {'fused (s)':>10} {'speedup':>8}")
+    for name, nodes, fused in cases:
+        nodes_time = best_time(nodes, options.repeat)
+        fused_time = best_time(fused, options.repeat)
+        print(f"{name:>14} {nodes_time:>10.4f} {fused_time:>10.4f} {nodes_time / fused_time:>7.2f}x")
+        results[name] = {"nodes_s": nodes_time, "fused_s": fused_time}
+    return results
+
+def unescaped_leaf_html(self):
+    # LeafNode.leaf_html as it was before escaping, kept as a baseline.
+    if self.tag in htmlnode.VOID_TAGS:
+        return f"<{self.tag}{self.props_to_html()}>"
+    if not self.value:
+        raise ValueError("LeafNode must have a value")
+    if not self.tag:
+        return self.value
+    return f"<{self.tag}{self.props_to_html()}>{self.value}</{self.tag}>"
+
+@contextlib.contextmanager
+def escaping_disabled():
+    # Rendering as it was before escaping, for comparison: leaf_html is
+    # swapped for the baseline above, escape_html for str, which hands a str
+    # back unchanged, and the per-block check for operator.not_, which is
+    # False for any non-empty block.
+    patches = [(LeafNode, "leaf_html", unescaped_leaf_html), (htmlnode, "escape_html", str),
+               (textnode, "escape_html", str), (markdown_parser, "escape_html", str),
+               (markdown_parser, "needs_escaping", operator.not_)]
+    originals = [(owner, name, vars(owner)[name]) for owner, name, _ in patches]
+    for owner, name, replacement in patches:
+        setattr(owner, name, replacement)
+    try:
+        yield
+    finally:
+        for owner, name, original in originals:
+            setattr(owner, name, original)
+
+def interleaved_times(render, rounds):
+    # The two variants take turns, one run each per round, so that noise
+    # from the machine hits both alike. The overhead is the median of the
+    # rounds' escaped/raw ratios, which one slow run can't move much; the
+    # best time of each variant is kept too.
+    raw_times = []
+    escaped_times = []
+    for _ in range(rounds):
+        with escaping_disabled():
+            raw_times.append(best_time(render, 1))
+        escaped_times.append(best_time(render, 1))
+    ratios = sorted(escaped / raw for raw, escaped in zip(raw_times, escaped_times))
+    return min(raw_times), min(escaped_times), statistics.median(ratios) - 1
+
+def bench_escaping(options):
+    # Clean text takes the fast path; the dirty corpus puts an escapable
+    # character in a fifth of the words to show the slow path too. At least
+    # 15 rounds are run whatever --repeat says, as fewer leave the overhead
+    # within the noise.
+    clean = generate_corpus(options.size, options.seed)
+    dirty = clean.replace(" site ", " site & ").replace(" node ", " <node> ")
+    rounds = max(options.repeat, 15)
+    results = {}
+    print(f"{'case':>16} {'raw (s)':>10} {'escaped (s)':>12} {'overhead':>9}")
+    for corpus_name, markdown in (("clean", clean), ("dirty", dirty)):
+        blocks = markdown_to_blocks(markdown)
+        parsed_blocks = [(block, block_type, parse_block(block, block_type))
+                         for block, block_type in zip(blocks, classify_blocks(blocks))]
+        fused = lambda: [build_block_html(*parsed_block) for parsed_block in parsed_blocks]
+        tree = markdown_to_html_node(markdown)
+        for render_name, render in (("fused", fused), ("tree", tree.to_html)):
+            raw, escaped, overhead = interleaved_times(render, rounds)
+            name = f"{corpus_name} {render_name}"
+            print(f"{name:>16} {raw:>10.4f} {escaped:>12.4f} {overhead * 100:>8.1f}%")
+            results[name] = {"raw_s": raw, "escaped_s": escaped, "overhead": overhead}
+    return results
+
+def shared_nav(memoize):
+    # nav > ul > 249 x (li > a): 500 nodes.
+    items = [ParentNode("li", [LeafNode("a", f"Section {i}", {"href": f"/section/{i}.html"})]) for i in range(249)]
+    return ParentNode("nav", [ParentNode("ul", items)], memoize=memoize)
+
+def bench_shared_nav(options):
+    # 20k page trees that all contain the same 500-node navigation subtree,
+    # rendered with and without memoizing it, and with it rendered up front
+    # and spliced in as a RawHTMLNode.
+    pages = 20000
+    results = {"pages": pages}
+    print(f"{'nav':>10} {'seconds':>10} {'us/page':>10}")
+    navs = (("plain", lambda: shared_nav(False)), ("memoized", lambda: shared_nav(True)),
+            ("raw", lambda: RawHTMLNode(shared_nav(False).to_html())))
+    for name, make_nav in navs:
+        nav = make_nav()
+        trees = [ParentNode("body", [nav, ParentNode("main", [ParentNode("h1", [LeafNode(None, f"Page {i}")]),
+                                                             ParentNode("p", [LeafNode(None, "Some text.")])])])
+                 for i in range(pages)]
+        seconds = best_time(lambda: [tree.to_html() for tree in trees], options.repeat)
+        print(f"{name:>10} {seconds:>10.4f} {seconds / pages * 1e6:>10.2f}")
+        results[name] = seconds
+    return results
@@ -0,0 +1,114 @@
+import contextlib
+import io
+import os
+import tempfile
+import time
+
+from benchmarks import best_time, write_file
+from main import build
+from markdown_parser import BlockCache
+from template import TemplateCache, load_template
+
+
+def synthetic_site(root, pages=20000, layouts=50, sidebars=5):
+    # Every layout includes one of a few shared sidebar partials, and pages
+    # are spread evenly across the layouts.
+    templates_dir = os.path.join(root, "templates")
+    content_dir = os.path.join(root, "content")
+    for i in range(layouts):
+        write_file(os.path.join(templates_dir, f"layout{i}.html"),
+                   f"<title>{{{{ Title }}}}</title>{{{{> partials/sidebar{i % sidebars}.html }}}}{{{{ Content }}}}")
+    for i in range(sidebars):
+        write_file(os.path.join(templates_dir, "partials", f"sidebar{i}.html"), f"<aside>sidebar {i}</aside>")
+    write_file(os.path.join(templates_dir, "template.html"), "{{ Content }}")
+    for i in range(pages):
+        write_file(os.path.join(content_dir, f"section{i % 100}", f"page{i}.md"),
+                   f"---\nlayout: layout{i % layouts}.html\n---\n# Page {i}\n\nSome **text** for page {i}.")
+    return content_dir, templates_dir
+
+def bench_template_deps(options):
+    with tempfile.TemporaryDirectory() as root:
+        content_dir, templates_dir = synthetic_site(root)
+        output_dir = os.path.join(root, "public")
+
+        results = {}
+
+        def timed_build(label):
+            start = time.perf_counter()
+            with contextlib.redirect_stdout(io.StringIO()):
+                count = build(content_dir, output_dir, incremental=True, templates_dir=templates_dir, explain=True)
+            elapsed = time.perf_counter() - start
+            print(f"{label:>24} {count:>8} {elapsed:>10.3f}")
+            results[label] = {"rebuilt": count, "seconds": elapsed}
+
+        print(f"{'build':>24} {'rebuilt':>8} {'time (s)':>10}")
+        timed_build("full")
+        timed_build("no-op")
+        write_file(os.path.join(templates_dir, "layout7.html"), "<main>{{ Content }}</main>")
+        timed_build("edit one layout")
+        write_file(os.path.join(templates_dir, "partials", "sidebar3.html"), "<aside>edited</aside>")
+        timed_build("edit one partial")
+    return results
+
+def bench_watch_rebuild(options):
+    # Save-to-output latency for one edit to a ~2 MB page, as watch mode
+    # rebuilds it, with and without the session's block cache.
+    section = "## Section {i}\n\nSome **bold** text with a [link](https://example.com/{i}) and `code`.\n\n- item one\n- item _two_\n\n"
+    markdown = "".join(section.format(i=i) for i in range(20000))
+    with tempfile.TemporaryDirectory() as root:
+        content_dir = os.path.join(root, "content")
+        output_dir = os.path.join(root, "public")
+        page_path = os.path.join(content_dir, "big.md")
+        write_file(page_path, markdown)
+        print(f"page size {len(markdown) / 1e6:.1f} MB")
+        results = {"page_bytes": len(markdown)}
+        for label, cache in (("no cache", None), ("block cache", BlockCache(max_blocks=100000, max_bytes=256 * 1024 * 1024))):
+            build(content_dir, output_dir, incremental=True, cache=cache)
+            write_file(page_path, markdown.replace("Section 10000\n", "Section ten thousand\n"))
+            start = time.perf_counter()
+            build(content_dir, output_dir, incremental=True, cache=cache)
+            elapsed = time.perf_counter() - start
+            print(f"{label:>12} rebuild {elapsed * 1000:.0f}ms")
+            results[label] = elapsed
+            write_file(page_path, markdown)
+    return results
+
+def bench_templates(options):
+    # Wrapping 20k rendered pages in a layout with a few partials: reading
+    # and str.replace-ing the template for every page, as before, against one
+    # TemplateCache of compiled templates for the whole build.
+    pages = 20000
+    content = "<div>" + "<p>Some rendered page content.</p>" * 60 + "</div>"
+    with tempfile.TemporaryDirectory() as templates_dir:
+        write_file(os.path.join(templates_dir, "template.html"),
+                   "<html><head><title>{{ Title }}</title>{{> head.html }}</head>"
+                   "<body>{{> nav.html }}<main>{{ Content }}</main>{{> footer.html }}</body></html>")
+        write_file(os.path.join(templates_dir, "head.html"), '<link rel="stylesheet" href="/site.css">\n' * 20)
+        write_file(os.path.join(templates_dir, "nav.html"), '<a href="/section">Section</a>\n' * 100)
+        write_file(os.path.join(templates_dir, "footer.html"), "<footer>" + "Footer text. " * 100 + "</footer>")
+
+        def naive():
+            for i in range(pages):
+                template = load_template(templates_dir, "template.html", [])
+                template.replace("{{ Title }}", f"Page {i}").replace("{{ Content }}", content)
+
+        def replace_only():
+            # str.replace with the template read just once, to separate the
+            # cost of rendering from that of reading the files.
+            template = load_template(templates_dir, "template.html", [])
+            for i in range(pages):
+                template.replace("{{ Title }}", f"Page {i}").replace("{{ Content }}", content)
+
+        def compiled():
+            templates = TemplateCache(templates_dir)
+            for i in range(pages):
+                template, _ = templates.get("template.html")
+                template.render({"Title": f"Page {i}", "Content": content})
+
+        results = {"pages": pages}
+        print(f"{'templates':>10} {'seconds':>10} {'us/page':>10}")
+        for name, run in (("naive", naive), ("replace", replace_only), ("compiled", compiled)):
+            seconds = best_time(run, options.repeat)
+            print(f"{name:>10} {seconds:>10.4f} {seconds / pages * 1e6:>10.2f}")
+            results[name] = seconds
+    return results
@@ -0,0 +1,41 @@
+from benchmarks import best_time
+from benchmarks.corpus import generate_corpus
+from markdown_parser import (
+    build_block_node,
+    classify_blocks,
+    markdown_to_blocks,
+    markdown_to_html_node,
+    parse_block,
+)
+
+
+def bench_stages(options):
+    markdown = generate_corpus(options.size, options.seed)
+    blocks = markdown_to_blocks(markdown)
+    block_types = classify_blocks(blocks)
+    typed_blocks = list(zip(blocks, block_types))
+    parsed = [parse_block(block, block_type) for block, block_type in typed_blocks]
+    parsed_blocks = list(zip(blocks, block_types, parsed))
+    tree = markdown_to_html_node(markdown)
+
+    seconds = {
+        "blocks": best_time(lambda: markdown_to_blocks(markdown), options.repeat),
+        "classify": best_time(lambda: classify_blocks(blocks), options.repeat),
+        "inline": best_time(lambda: [parse_block(block, block_type) for block, block_type in typed_blocks], options.repeat),
+        "nodes": best_time(lambda: [build_block_node(*parsed_block) for parsed_block in parsed_blocks], options.repeat),
+        "render": best_time(tree.to_html, options.repeat),
+        "total": best_time(lambda: markdown_to_html_node(markdown).to_html(), options.repeat),
+    }
+
+    print(f"corpus: {len(markdown)} chars, {len(blocks)} blocks, seed {options.seed}")
+    print(f"{'stage':>10} {'seconds':>10} {'MB/s':>8}")
+    for stage, elapsed in seconds.items():
+        print(f"{stage:>10} {elapsed:>10.4f} {len(markdown) / elapsed / 1e6:>8.1f}")
+
+    return {
+        "chars": len(markdown),
+        "blocks": len(blocks),
+        "inline_nodes": sum(len(nodes) for block_nodes in parsed for nodes in block_nodes),
+        "seed": options.seed,
+        "seconds": seconds,
+    }
@@ -1,55 +1,315 @@
+class _EmptyList(list):
+    def _read_only(self, *args, **kwargs):
+        raise TypeError("Shared empty children list is read-only")
+
+    append = extend = insert = remove = pop = clear = sort = reverse = _read_only
+    __setitem__ = __delitem__ = __iadd__ = __imul__ = _read_only
+
+
+class _EmptyDict(dict):
+    def _read_only(self, *args, **kwargs):
+        raise TypeError("Shared empty props dict is read-only")
+
+    __setitem__ = __delitem__ = clear = pop = popitem = setdefault = update = _read_only
+    __ior__ = _read_only
+
+
+# Nodes without children or props all point at these instead of allocating
+# their own empty containers.
+EMPTY_CHILDREN = _EmptyList()
+EMPTY_PROPS = _EmptyDict()
+
+# Elements with no content or closing tag, rendered as just the opening tag.
+VOID_TAGS = frozenset(("img", "br", "hr"))
+
+
+def needs_escaping(text):
+    return "&" in text or "<" in text or ">" in text or '"' in text
+
+def escape_html(text):
+    # Escapes text for use as element content or a double-quoted attribute
+    # value. Most text has none of these characters, so it is checked for
+    # them first (the same test as needs_escaping, inlined to save a call)
+    # and returned as it is, without building a new string. Values that are
+    # not strings, such as a numeric width prop, are escaped as str(value);
+    # catching the TypeError keeps the check free for strings.
+    try:
+        if "&" in text or "<" in text or ">" in text or '"' in text:
+            return text.replace("&", "&amp;").replace("<", "&lt;").replace(">", "&gt;").replace('"', "&quot;")
+    except TypeError:
+        return escape_html(str(text))
+    return text
+
+
 class HTMLNode():
+    # html_cache is None unless the node memoizes its HTML; then it is the
+    # cached HTML, or "" while there is none. A LeafNode's html_cache is
+    # instead its value once that is known to need no escaping, see
+    # mark_clean. watchers lists the memoizing nodes whose cached HTML
+    # includes this node's, see track_subtree.
+    __slots__ = ("tag", "value", "children", "props", "html_cache", "watchers")
+
     def __init__(self, tag=None, value=None, children=None, props=None):
         self.tag = tag
         self.value = value
-        self.children = list(children) if children else []
-        self.props = dict(props) if props else {}
+        # Absent children or props share the read-only empties; containers
+        # passed in, even empty ones, are copied so callers can fill them.
+        self.children = EMPTY_CHILDREN if children is None else list(children)
+        self.props = EMPTY_PROPS if props is None else dict(props)
+        self.html_cache = None
+        self.watchers = None
         
     def to_html(self):
-        raise NotImplementedError("Subclasses must implement to_html()")
+        return "".join(self.iter_html())
+
+    def iter_html(self):
+        raise NotImplementedError("Subclasses must implement iter_html()")
+
+    def write_html(self, stream):
+        for chunk in self.iter_html():
+            stream.write(chunk)
+
+    def changed(self):
+        # Drops the cached HTML of every memoizing node this one is part of.
+        for watcher in self.watchers or ():
+            watcher.html_cache = ""
+
+    def __reduce_ex__(self, protocol):
+        # Copies start out untracked and with nothing cached: tracking only
+        # covers the node objects of the process that rendered them.
+        return (restore_node, (untracked_class(type(self)), self.tag, self.value, list(self.children),
+                               dict(self.props), self.html_cache is not None))
 
     def props_to_html(self):
         if not self.props:
             return ""
-        return " " + " ".join(f'{key}="{value}"' for key, value in self.props.items())
+        return " " + " ".join(f'{key}="{escape_html(value)}"' for key, value in self.props.items())
 
     def __repr__(self):
         return f"HTMLNode(tag={self.tag}, value={self.value}, children={self.children}, props={self.props})"
 
 
 class LeafNode(HTMLNode):
+    __slots__ = ()
+
     def __init__(self, tag, value, props=None):
         super().__init__(tag=tag, value=value, children=None, props=props)
 
-    def to_html(self):
-        if not self.value:
+    def iter_html(self):
+        yield self.leaf_html()
+
+    def leaf_html(self):
+        # A leaf renders to a single string; ParentNode takes it from here
+        # directly rather than through iter_html's generator.
+        if self.tag in VOID_TAGS:
+            return f"<{self.tag}{self.props_to_html()}>"
+
+        value = self.value
+        if not value:
             raise ValueError("LeafNode must have a value")
 
+        # Values marked clean skip the check; otherwise it is escape_html's
+        # check, inlined to save the call for the many leaves that are clean.
+        if self.html_cache is not value:
+            try:
+                if "&" in value or "<" in value or ">" in value or '"' in value:
+                    value = escape_html(value)
+            except TypeError:
+                value = escape_html(str(value))
+
         if not self.tag:
-            return self.value
+            return value
+
+        return f"<{self.tag}{self.props_to_html()}>{value}</{self.tag}>"
 
-        return f"<{self.tag}{self.props_to_html()}>{self.value}</{self.tag}>"
+    def mark_clean(self):
+        # Records that the current value needs no escaping, as when the whole
+        # source it came from was checked at once. The mark is the value
+        # object itself, so setting a new value drops it.
+        self.html_cache = self.value
 
     def __repr__(self):
         return f"LeafNode(tag={self.tag}, value={self.value}, props={self.props})"
 
 
+class RawHTMLNode(HTMLNode):
+    # Trusted markup, emitted exactly as given: the opt-out from escaping and
+    # the way to splice an already rendered fragment into a tree. The value is
+    # a str, UTF-8 bytes, or a callable returning either, which is only called
+    # when the node is first rendered (to load a fragment from disk, say).
+    # Either way the resulting str is kept for later renders.
+    __slots__ = ()
+
+    def __init__(self, value):
+        super().__init__(tag=None, value=value, children=None, props=None)
+
+    def iter_html(self):
+        yield self.raw_html()
+
+    def raw_html(self):
+        value = self.value
+        if type(value) is str:
+            return value
+        if callable(value):
+            value = value()
+        if isinstance(value, (bytes, bytearray, memoryview)):
+            value = bytes(value).decode("utf-8")
+        if not isinstance(value, str):
+            raise TypeError(f"RawHTMLNode value must be str, bytes or a callable returning one, not {type(value).__name__}")
+        # Not a change to the node's HTML, so it isn't reported as one.
+        object.__setattr__(self, "value", value)
+        return value
+
+    def __repr__(self):
+        return f"RawHTMLNode(value={self.value})"
+
+
 class ParentNode(HTMLNode):
-    def __init__(self, tag, children, props=None):
+    __slots__ = ()
+
+    def __init__(self, tag, children, props=None, memoize=False):
+        # A memoizing node renders its subtree once and reuses that HTML until
+        # something in the subtree changes. Use it for subtrees shared by many
+        # pages, such as navigation menus.
         super().__init__(tag=tag, value=None, children=children, props=props)
+        if memoize:
+            self.html_cache = ""
 
-    def to_html(self):
+    def iter_html(self):
+        if self.html_cache is not None:
+            yield self.memoized_html()
+            return
+        yield from self.render_html()
+
+    def memoized_html(self):
+        if not self.html_cache:
+            html = "".join(self.render_html())
+            track_subtree(self)
+            self.html_cache = html
+        return self.html_cache
+
+    def render_html(self):
+        # Walks the subtree with an explicit stack of child iterators instead
+        # of recursing, so nesting depth is not bound by the recursion limit.
+        yield self.open_tag()
+        stack = [(self, iter(self.children))]
+        while stack:
+            node, children = stack[-1]
+            child = next(children, None)
+            if child is None:
+                stack.pop()
+                yield f"</{node.tag}>"
+            elif isinstance(child, ParentNode):
+                if child.html_cache is not None:
+                    yield child.memoized_html()
+                    continue
+                yield child.open_tag()
+                stack.append((child, iter(child.children)))
+            elif type(child) is LeafNode:
+                yield child.leaf_html()
+            elif type(child) is RawHTMLNode:
+                yield child.raw_html()
+            else:
+                yield from child.iter_html()
+
+    def open_tag(self):
         if not self.tag:
             raise ValueError("ParentNode must have a tag")
 
         if not self.children:
             raise ValueError("ParentNode must have children")
 
-        child_string = "".join(child.to_html() for child in self.children)
-
-        return f"<{self.tag}{self.props_to_html()}>{child_string}</{self.tag}>"
+        return f"<{self.tag}{self.props_to_html()}>"
     
     def __repr__(self):
         return f"ParentNode(tag={self.tag}, children={self.children}, props={self.props})"
 
 
+# Dirty tracking. Nodes cost nothing extra until a memoizing node renders:
+# it then switches every node of its subtree to a tracked class and wraps
+# their children lists and props dicts, so that any later change to a tag,
+# value, props or children drops the cached HTML of the memoizing nodes
+# above it. Changes made through a list or dict taken from a node before it
+# was tracked are not seen.
+TRACKED_FIELDS = frozenset(("tag", "value", "children", "props"))
+TRACKED_CLASSES = {}
+
+
+class TrackedChildren(list):
+    __slots__ = ("node",)
+
+    def __init__(self, node, children):
+        super().__init__(children)
+        self.node = node
+
+    def __reduce_ex__(self, protocol):
+        return (list, (list(self),))
+
+
+class TrackedProps(dict):
+    __slots__ = ("node",)
+
+    def __init__(self, node, props):
+        super().__init__(props)
+        self.node = node
+
+    def __reduce_ex__(self, protocol):
+        return (dict, (dict(self),))
+
+
+def tracked_mutator(container_class, name):
+    method = getattr(container_class, name)
+
+    def mutator(self, *args, **kwargs):
+        result = method(self, *args, **kwargs)
+        self.node.changed()
+        return result
+
+    return mutator
+
+for name in ("append", "extend", "insert", "remove", "pop", "clear", "sort", "reverse",
+             "__setitem__", "__delitem__", "__iadd__", "__imul__"):
+    setattr(TrackedChildren, name, tracked_mutator(list, name))
+for name in ("__setitem__", "__delitem__", "clear", "pop", "popitem", "setdefault", "update", "__ior__"):
+    setattr(TrackedProps, name, tracked_mutator(dict, name))
+
+
+def tracked_setattr(self, name, value):
+    object.__setattr__(self, name, value)
+    if name in TRACKED_FIELDS:
+        self.changed()
+
+def tracked_class(cls):
+    tracked = TRACKED_CLASSES.get(cls)
+    if tracked is None:
+        tracked = type(cls.__name__, (cls,), {"__slots__": (), "__setattr__": tracked_setattr, "untracked": cls})
+        TRACKED_CLASSES[cls] = tracked
+    return tracked
+
+def untracked_class(cls):
+    return getattr(cls, "untracked", cls)
+
+def track_subtree(memo):
+    # Makes every node under memo (memo included) report changes to it.
+    stack = [memo]
+    while stack:
+        node = stack.pop()
+        cls = type(node)
+        if "untracked" not in cls.__dict__:
+            object.__setattr__(node, "__class__", tracked_class(cls))
+        if node.children is not EMPTY_CHILDREN and type(node.children) is not TrackedChildren:
+            object.__setattr__(node, "children", TrackedChildren(node, node.children))
+        if node.props is not EMPTY_PROPS and type(node.props) is not TrackedProps:
+            object.__setattr__(node, "props", TrackedProps(node, node.props))
+        if node.watchers is None:
+            node.watchers = [memo]
+        elif memo not in node.watchers:
+            node.watchers.append(memo)
+        stack.extend(node.children)
+
+def restore_node(cls, tag, value, children, props, memoize):
+    node = cls.__new__(cls)
+    HTMLNode.__init__(node, tag, value, children, props)
+    if memoize:
+        node.html_cache = ""
+    return node
@@ -1 +1,405 @@
-print ("Hello World")
\ No newline at end of file
+import argparse
+import contextlib
+import hashlib
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+
+from htmlnode import escape_html
+from markdown_parser import (
+    BlockCache,
+    build_block_html,
+    classify_blocks,
+    markdown_to_blocks,
+    markdown_to_html,
+    parse_block,
+    render_parsed,
+)
+from parse_cache import ParseCache
+from profiling import Profile
+from tracing import Tracer
+from template import DEFAULT_TEMPLATE, TemplateCache, extract_title, split_front_matter
+
+MANIFEST_NAME = ".manifest.json"
+MANIFEST_VERSION = 2
+# Big enough to hold every block of a few multi-megabyte pages being edited.
+WATCH_CACHE_BLOCKS = 100000
+WATCH_CACHE_BYTES = 256 * 1024 * 1024
+
+def find_pages(content_dir, output_dir):
+    pages = []
+    for root, dirs, files in os.walk(content_dir):
+        dirs.sort()
+        relative_root = os.path.relpath(root, content_dir)
+        output_root = output_dir if relative_root == "." else os.path.join(output_dir, relative_root)
+        for name in sorted(files):
+            if not name.endswith(".md"):
+                continue
+            source_path = os.path.join(root, name)
+            output_path = os.path.join(output_root, name[:-3] + ".html")
+            pages.append((source_path, output_path))
+    return pages
+
+def render_traced(markdown, tracer):
+    # markdown_to_html with every stage in its own span.
+    with tracer.span("block split"):
+        blocks = markdown_to_blocks(markdown)
+    with tracer.span("classify"):
+        block_types = classify_blocks(blocks)
+    with tracer.span("inline parse"):
+        parsed = [parse_block(block, block_type) for block, block_type in zip(blocks, block_types)]
+    with tracer.span("render"):
+        parts = [build_block_html(*parsed_block) for parsed_block in zip(blocks, block_types, parsed)]
+        return f"<div>{''.join(parts)}</div>"
+
+class PageError(Exception):
+    # A page failed to convert; the message starts with its source path.
+    pass
+
+def convert_page(source_path, output_path, templates=None, cache=None, trace=False, parse_cache=None):
+    # Renders a page into its layout from `templates`, a TemplateCache, when
+    # given, loading its parse from `parse_cache`, a ParseCache, if it has it.
+    # Returns the templates and partials the page was rendered with, and the
+    # page's trace events (empty unless trace is set). Any error is re-raised
+    # as a PageError naming the page.
+    tracer = Tracer(enabled=trace)
+    try:
+        with tracer.span("page", source=source_path):
+            with tracer.span("read"):
+                with open(source_path, encoding="utf-8") as source_file:
+                    markdown = source_file.read()
+
+            meta, markdown = split_front_matter(markdown)
+            if trace:
+                html = render_traced(markdown, tracer)
+            elif parse_cache is not None:
+                html = render_parsed(parse_cache.get_parsed(markdown))
+            else:
+                html = markdown_to_html(markdown, cache)
+
+            template = None
+            used_templates = []
+            if templates is not None:
+                with tracer.span("template"):
+                    template, used = templates.get(meta.get("layout", DEFAULT_TEMPLATE))
+                    used_templates = list(used)
+                    title = extract_title(markdown) or os.path.splitext(os.path.basename(source_path))[0]
+
+            with tracer.span("write"):
+                os.makedirs(os.path.dirname(output_path), exist_ok=True)
+                with open(output_path, "w", encoding="utf-8") as output_file:
+                    if template is None:
+                        output_file.write(html)
+                    else:
+                        template.write(output_file, {"Title": escape_html(title), "Content": html})
+    except Exception as error:
+        raise PageError(f"{source_path}: {error}") from error
+
+    return used_templates, tracer.events
+
+# Set in each worker process by init_worker, so the compiled templates are
+# sent to a worker once rather than with every batch of pages.
+worker_templates = None
+worker_parse_cache = None
+
+def init_worker(templates, parse_cache):
+    global worker_templates, worker_parse_cache
+    worker_templates = templates
+    worker_parse_cache = parse_cache
+
+def convert_page_in_worker(source_path, output_path, trace):
+    return convert_page(source_path, output_path, worker_templates, None, trace, worker_parse_cache)
+
+def convert_pages(pages, jobs=1, templates_dir=None, cache=None, trace=False, parse_cache_dir=None):
+    # A block cache lives in this process, so using one means converting here.
+    # Templates are compiled once per build and shared by all its pages.
+    templates = None if templates_dir is None else TemplateCache(templates_dir)
+    parse_cache = None if parse_cache_dir is None else ParseCache(parse_cache_dir)
+    if jobs <= 1 or len(pages) <= 1 or cache is not None:
+        return [convert_page(source_path, output_path, templates, cache, trace, parse_cache)
+                for source_path, output_path in pages]
+
+    sources = [source_path for source_path, _ in pages]
+    outputs = [output_path for _, output_path in pages]
+    # A few chunks per worker keeps them all busy to the end without
+    # paying a round trip to the pool for every page.
+    chunk_size = max(1, len(pages) // (jobs * 4))
+    if templates is not None:
+        templates.preload()
+    with ProcessPoolExecutor(max_workers=jobs, initializer=init_worker, initargs=(templates, parse_cache)) as executor:
+        results = executor.map(convert_page_in_worker, sources, outputs, repeat(trace), chunksize=chunk_size)
+        return list(results)
+
+def hash_file(path):
+    with open(path, "rb") as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+def hash_templates(templates_dir):
+    if templates_dir is None:
+        return {}
+    hashes = {}
+    for root, _, files in os.walk(templates_dir):
+        for name in files:
+            path = os.path.join(root, name)
+            hashes[os.path.relpath(path, templates_dir).replace(os.sep, "/")] = hash_file(path)
+    return hashes
+
+def load_manifest(manifest_path):
+    try:
+        with open(manifest_path, encoding="utf-8") as f:
+            manifest = json.load(f)
+    except (FileNotFoundError, ValueError):
+        return {}
+    if manifest.pop("version", None) != MANIFEST_VERSION:
+        return {}
+    return manifest
+
+def save_manifest(manifest_path, manifest):
+    os.makedirs(os.path.dirname(manifest_path), exist_ok=True)
+    temp_path = manifest_path + ".tmp"
+    with open(temp_path, "w", encoding="utf-8") as f:
+        json.dump(dict(manifest, version=MANIFEST_VERSION), f, separators=(",", ":"))
+    os.replace(temp_path, manifest_path)
+
+def template_dependents(entries):
+    # Reverse dependency graph: template or partial name -> pages that used it.
+    dependents = {}
+    for key, entry in entries.items():
+        for name in entry["templates"]:
+            dependents.setdefault(name, []).append(key)
+    return dependents
+
+def plan_build(pages, old_manifest, content_dir, output_dir, templates_dir=None):
+    # Returns the new manifest entries and the (source, output, reason) of
+    # every page that needs converting. A page whose size and mtime match its
+    # entry is trusted without reading it; otherwise its content hash decides.
+    # Template edits only reach the pages that used that template last build.
+    old_entries = old_manifest.get("pages", {})
+    old_template_hashes = old_manifest.get("templates", {})
+    template_hashes = hash_templates(templates_dir)
+    settings_changed = old_manifest.get("templates_dir") != templates_dir
+
+    template_reasons = {}
+    dependents = template_dependents(old_entries)
+    for name in sorted(old_template_hashes.keys() | template_hashes.keys()):
+        if old_template_hashes.get(name) == template_hashes.get(name):
+            continue
+        for key in dependents.get(name, ()):
+            template_reasons.setdefault(key, f"template changed: {name}")
+
+    entries = {}
+    stale = []
+    # find_pages builds every path under these prefixes, so slicing them off
+    # is enough to get the relative paths without os.path.relpath per page.
+    content_prefix = len(os.path.join(content_dir, ""))
+    output_prefix = len(os.path.join(output_dir, ""))
+    for source_path, output_path in pages:
+        key = source_path[content_prefix:]
+        output = output_path[output_prefix:]
+        stat = os.stat(source_path)
+        old = old_entries.get(key)
+
+        if old is None:
+            reason = "new page"
+        elif settings_changed:
+            reason = "templates directory changed"
+        elif old["output"] != output:
+            reason = "output path changed"
+        elif not os.path.exists(output_path):
+            reason = "output missing"
+        else:
+            reason = template_reasons.get(key)
+
+        if reason is None and old["mtime_ns"] == stat.st_mtime_ns and old["size"] == stat.st_size:
+            entries[key] = old
+            continue
+
+        content_hash = hash_file(source_path)
+        if reason is None and old["hash"] != content_hash:
+            reason = "source changed"
+        entries[key] = {
+            "hash": content_hash,
+            "mtime_ns": stat.st_mtime_ns,
+            "size": stat.st_size,
+            "templates": old["templates"] if old else [],
+            "output": output,
+        }
+        if reason is not None:
+            stale.append((source_path, output_path, reason))
+
+    manifest = {"templates_dir": templates_dir, "templates": template_hashes, "pages": entries}
+    return manifest, stale
+
+def remove_deleted_outputs(old_entries, entries, output_dir):
+    removed = 0
+    for key, old in old_entries.items():
+        if key in entries:
+            continue
+        try:
+            os.remove(os.path.join(output_dir, old["output"]))
+        except FileNotFoundError:
+            pass
+        removed += 1
+    return removed
+
+def build(content_dir, output_dir, jobs=1, incremental=False, templates_dir=None, explain=False, cache=None,
+          trace_path=None, parse_cache_dir=None):
+    pages = find_pages(content_dir, output_dir)
+    trace = trace_path is not None
+    if not incremental:
+        results = convert_pages(pages, jobs, templates_dir, cache, trace, parse_cache_dir)
+        write_trace(trace_path, results)
+        return len(pages)
+
+    manifest_path = os.path.join(output_dir, MANIFEST_NAME)
+    old_manifest = load_manifest(manifest_path)
+    manifest, stale = plan_build(pages, old_manifest, content_dir, output_dir, templates_dir)
+
+    results = convert_pages([(source, output) for source, output, _ in stale], jobs, templates_dir, cache, trace,
+                            parse_cache_dir)
+    write_trace(trace_path, results)
+    content_prefix = len(os.path.join(content_dir, ""))
+    for (source_path, _, reason), (templates, _) in zip(stale, results):
+        key = source_path[content_prefix:]
+        manifest["pages"][key]["templates"] = templates
+        if explain:
+            print(f"rebuilt {key}: {reason}")
+
+    old_entries = old_manifest.get("pages", {})
+    removed = remove_deleted_outputs(old_entries, manifest["pages"], output_dir)
+    if explain:
+        for key in sorted(old_entries.keys() - manifest["pages"].keys()):
+            print(f"removed {old_entries[key]['output']}: source deleted")
+
+    if stale or removed or manifest != old_manifest:
+        save_manifest(manifest_path, manifest)
+    return len(stale)
+
+def write_trace(trace_path, results):
+    if trace_path is None:
+        return
+    tracer = Tracer()
+    for _, events in results:
+        tracer.events.extend(events)
+    tracer.write(trace_path)
+
+def snapshot(*directories):
+    state = {}
+    for directory in directories:
+        if directory is None:
+            continue
+        for root, _, files in os.walk(directory):
+            for name in files:
+                path = os.path.join(root, name)
+                try:
+                    stat = os.stat(path)
+                except FileNotFoundError:
+                    continue
+                state[path] = (stat.st_mtime_ns, stat.st_size)
+    return state
+
+def wait_for_changes(previous, directories, interval=0.5, debounce=0.1):
+    # Polls until something changes, then keeps waiting until a whole
+    # debounce window passes quietly so a burst of saves is one rebuild.
+    current = previous
+    while current == previous:
+        time.sleep(interval)
+        current = snapshot(*directories)
+
+    while True:
+        time.sleep(debounce)
+        latest = snapshot(*directories)
+        if latest == current:
+            return current
+        current = latest
+
+def watch(content_dir, output_dir, templates_dir=None, interval=0.5, debounce=0.1, explain=False, rebuilds=None):
+    # Rebuilds incrementally whenever the content or templates change. One
+    # block cache is kept for the whole session, so an edited page only
+    # re-renders the blocks that changed. Runs until interrupted, or for
+    # `rebuilds` rebuilds when given.
+    cache = BlockCache(max_blocks=WATCH_CACHE_BLOCKS, max_bytes=WATCH_CACHE_BYTES)
+    directories = (content_dir, templates_dir)
+    state = snapshot(*directories)
+    # A failed build leaves its pages stale in the manifest, so they are
+    # retried on the next change rather than ending the session.
+    try:
+        build(content_dir, output_dir, incremental=True, templates_dir=templates_dir, explain=explain, cache=cache)
+    except Exception as error:
+        print(f"Build failed: {error}")
+    print(f"Watching {content_dir} for changes")
+
+    while rebuilds is None or rebuilds > 0:
+        state = wait_for_changes(state, directories, interval, debounce)
+        start = time.perf_counter()
+        try:
+            count = build(content_dir, output_dir, incremental=True, templates_dir=templates_dir, explain=explain,
+                          cache=cache)
+        except Exception as error:
+            print(f"Rebuild failed: {error}")
+        else:
+            elapsed = time.perf_counter() - start
+            print(f"Rebuilt {count} pages in {elapsed * 1000:.0f}ms")
+        if rebuilds is not None:
+            rebuilds -= 1
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Static site generator")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    build_parser = subparsers.add_parser("build", help="convert a content directory of markdown to HTML")
+    build_parser.add_argument("content_dir", nargs="?", default="content")
+    build_parser.add_argument("output_dir", nargs="?", default="public")
+    build_parser.add_argument("--jobs", "-j", type=int, default=1,
+                              help="worker processes to convert pages with (0 for one per CPU)")
+    build_parser.add_argument("--incremental", "-i", action="store_true",
+                              help="only reconvert pages whose source or templates changed since the last build")
+    build_parser.add_argument("--templates", "-t", dest="templates_dir",
+                              help=f"directory of page templates; pages use {DEFAULT_TEMPLATE} unless their front matter sets a layout")
+    build_parser.add_argument("--explain", action="store_true",
+                              help="with --incremental, print why each page was rebuilt")
+    build_parser.add_argument("--profile", action="store_true",
+                              help="print per-stage call counts and timings (converts in this process)")
+    build_parser.add_argument("--trace", dest="trace_path",
+                              help="write per-page stage timings to this file as Chrome trace-event JSON")
+    build_parser.add_argument("--parse-cache", dest="parse_cache_dir",
+                              help="directory to keep parsed pages in, so later builds load them instead of parsing")
+
+    watch_parser = subparsers.add_parser("watch", help="rebuild changed pages whenever the content changes")
+    watch_parser.add_argument("content_dir", nargs="?", default="content")
+    watch_parser.add_argument("output_dir", nargs="?", default="public")
+    watch_parser.add_argument("--templates", "-t", dest="templates_dir",
+                              help=f"directory of page templates; pages use {DEFAULT_TEMPLATE} unless their front matter sets a layout")
+    watch_parser.add_argument("--interval", type=float, default=0.5,
+                              help="seconds between polls of the content directory")
+    watch_parser.add_argument("--debounce", type=float, default=0.1,
+                              help="seconds without further changes before rebuilding")
+    watch_parser.add_argument("--explain", action="store_true",
+                              help="print why each page was rebuilt")
+
+    args = parser.parse_args(argv)
+
+    if args.command == "build":
+        # Stage timings are only collected in this process, not in workers.
+        jobs = 1 if args.profile else args.jobs or os.cpu_count() or 1
+        profile = Profile() if args.profile else contextlib.nullcontext()
+        start = time.perf_counter()
+        with profile:
+            count = build(args.content_dir, args.output_dir, jobs, args.incremental, args.templates_dir, args.explain,
+                          trace_path=args.trace_path, parse_cache_dir=args.parse_cache_dir)
+        elapsed = time.perf_counter() - start
+        rate = count / elapsed if elapsed else 0.0
+        print(f"Built {count} pages in {elapsed:.2f}s ({rate:.0f} pages/sec, {jobs} jobs)")
+        if args.profile:
+            print(profile.report())
+    elif args.command == "watch":
+        try:
+            watch(args.content_dir, args.output_dir, args.templates_dir, args.interval, args.debounce, args.explain)
+        except KeyboardInterrupt:
+            pass
+
+
+if __name__ == "__main__":
+    main()
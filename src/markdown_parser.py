@@ -1,6 +1,15 @@
+import hashlib
+import mmap
+import os
 import re
+from collections import OrderedDict
 from enum import Enum
-from textnode import TextNode, TextType
+from htmlnode import LeafNode, ParentNode, RawHTMLNode, escape_html, needs_escaping
+from textnode import SourceTextNode, TextNode, TextNodeArray, TextType, text_node_to_html_node, text_nodes_to_html
+
+# Bump whenever a change to the parser changes what it produces for the same
+# markdown, so parse results cached on disk by older versions are not used.
+PARSER_VERSION = 2
 
 class BlockType(Enum):
     PARAGRAPH = "paragraph"
@@ -26,11 +35,14 @@ def split_nodes_delimiter(old_nodes, delimiter, text_type):
 
     return new_nodes
 
+IMAGE_PATTERN = re.compile(r'!\[([^\[\]]*)\]\(([^()]*)\)')
+LINK_PATTERN = re.compile(r'(?<!\!)\[(?!\!\[)([^\[\]]*)\]\(([^()]*)\)')
+
 def extract_markdown_images(text):
-    return re.findall(r'!\[([^\[\]]*)\]\(([^()]*)\)', text)
+    return IMAGE_PATTERN.findall(text)
 
 def extract_markdown_links(text):
-    return re.findall(r'(?<!\!)\[(?!\!\[)([^\[\]]*)\]\(([^()]*)\)', text)
+    return LINK_PATTERN.findall(text)
 
 def split_nodes_image(old_nodes):
     new_nodes = []
@@ -38,26 +50,20 @@ def split_nodes_image(old_nodes):
         if node.text_type != TextType.TEXT:
             new_nodes.append(node)
             continue
-        
-        images = extract_markdown_images(node.text)
-        if not images:
-            new_nodes.append(node)
-            continue
-        
+
         text = node.text
-        for alt_text, url in images:
-            pattern = f"![{alt_text}]({url})"
-            if pattern in text:
-                parts = text.split(pattern, 1)
-                if len(parts) == 2:
-                    if parts[0]:
-                        new_nodes.append(TextNode(parts[0], TextType.TEXT))
-                    new_nodes.append(TextNode(alt_text, TextType.IMAGE, url))
-                    text = parts[1]
-        
-        if text:
-            new_nodes.append(TextNode(text, TextType.TEXT))
-    
+        pos = 0
+        for match in IMAGE_PATTERN.finditer(text):
+            if match.start() > pos:
+                new_nodes.append(TextNode(text[pos:match.start()], TextType.TEXT))
+            new_nodes.append(TextNode(match.group(1), TextType.IMAGE, match.group(2)))
+            pos = match.end()
+
+        if pos == 0:
+            new_nodes.append(node)
+        elif pos < len(text):
+            new_nodes.append(TextNode(text[pos:], TextType.TEXT))
+
     return new_nodes
 
 def split_nodes_link(old_nodes):
@@ -66,40 +72,128 @@ def split_nodes_link(old_nodes):
         if node.text_type != TextType.TEXT:
             new_nodes.append(node)
             continue
-        
-        links = extract_markdown_links(node.text)
-        if not links:
-            new_nodes.append(node)
-            continue
-        
+
         text = node.text
-        for link_text, url in links:
-            pattern = f"[{link_text}]({url})"
-            if pattern in text:
-                parts = text.split(pattern, 1)
-                if len(parts) == 2:
-                    if parts[0]:
-                        new_nodes.append(TextNode(parts[0], TextType.TEXT))
-                    if link_text:
-                        new_nodes.append(TextNode(link_text, TextType.LINK, url))
-                    text = parts[1]
-        
-        if text:
-            new_nodes.append(TextNode(text, TextType.TEXT))
-    
+        pos = 0
+        for match in LINK_PATTERN.finditer(text):
+            if match.start() > pos:
+                new_nodes.append(TextNode(text[pos:match.start()], TextType.TEXT))
+            if match.group(1):
+                new_nodes.append(TextNode(match.group(1), TextType.LINK, match.group(2)))
+            pos = match.end()
+
+        if pos == 0:
+            new_nodes.append(node)
+        elif pos < len(text):
+            new_nodes.append(TextNode(text[pos:], TextType.TEXT))
+
     return new_nodes
 
-def text_to_textnodes(text):
-    first_node = [TextNode(text, TextType.TEXT)]
-    code_nodes = split_nodes_delimiter(first_node, "`", TextType.CODE)
-    image_nodes = split_nodes_image(code_nodes)
-    link_nodes = split_nodes_link(image_nodes)
-    bold_nodes = split_nodes_delimiter(link_nodes, "**", TextType.BOLD)
-    final_nodes = split_nodes_delimiter(bold_nodes, "_", TextType.ITALIC)
+def text_to_textnodes(text, offsets=False, columnar=False):
+    # Walks the text once, left to right, emitting nodes straight into one
+    # list. Nesting follows the old pipeline order: code spans first, then
+    # images, links, bold and finally italic inside whatever is left. The
+    # tokenizers only pass offsets around; with offsets=True the nodes are
+    # SourceTextNodes that keep those offsets into text rather than a copy,
+    # and with columnar=True they are stored in a TextNodeArray instead of
+    # being built at all.
+    if columnar:
+        new_nodes = TextNodeArray(text)
+        add = new_nodes.add
+    else:
+        new_nodes = []
+        add = _source_adder(new_nodes) if offsets else _sliced_adder(new_nodes)
+    pos = 0
+    code = False
+    end = len(text)
+    while True:
+        mark = text.find("`", pos)
+        stop = end if mark == -1 else mark
+        if stop > pos:
+            if code:
+                add(text, pos, stop, TextType.CODE, None)
+            else:
+                _tokenize_images(text, pos, stop, add)
+        if mark == -1:
+            break
+        pos = mark + 1
+        code = not code
+    if code:
+        raise Exception("The markdown used has invalid syntax")
+
+    return new_nodes
 
-    return final_nodes
+# The tokenizers report each node as add(source, start, end, text_type, url).
+def _sliced_adder(new_nodes):
+    append = new_nodes.append
+    def add(source, start, end, text_type, url):
+        append(TextNode(source[start:end], text_type, url))
+    return add
+
+def _source_adder(new_nodes):
+    append = new_nodes.append
+    def add(source, start, end, text_type, url):
+        append(SourceTextNode(source, start, end, text_type, url))
+    return add
+
+def _tokenize_images(text, start, end, add):
+    pos = start
+    for match in IMAGE_PATTERN.finditer(text, start, end):
+        if match.start() > pos:
+            _tokenize_links(text, pos, match.start(), add)
+        add(text, match.start(1), match.end(1), TextType.IMAGE, match.group(2))
+        pos = match.end()
+    if pos < end:
+        _tokenize_links(text, pos, end, add)
+
+def _tokenize_links(text, start, end, add):
+    pos = start
+    for match in LINK_PATTERN.finditer(text, start, end):
+        if match.start() > pos:
+            _tokenize_emphasis(text, pos, match.start(), add)
+        if match.end(1) > match.start(1):
+            add(text, match.start(1), match.end(1), TextType.LINK, match.group(2))
+        pos = match.end()
+    if pos < end:
+        _tokenize_emphasis(text, pos, end, add)
+
+def _tokenize_emphasis(text, start, end, add):
+    pos = start
+    bold = False
+    while True:
+        mark = text.find("**", pos, end)
+        stop = end if mark == -1 else mark
+        if stop > pos:
+            if bold:
+                add(text, pos, stop, TextType.BOLD, None)
+            else:
+                _tokenize_italic(text, pos, stop, add)
+        if mark == -1:
+            break
+        pos = mark + 2
+        bold = not bold
+    if bold:
+        raise Exception("The markdown used has invalid syntax")
+
+def _tokenize_italic(text, start, end, add):
+    pos = start
+    italic = False
+    while True:
+        mark = text.find("_", pos, end)
+        stop = end if mark == -1 else mark
+        if stop > pos:
+            text_type = TextType.ITALIC if italic else TextType.TEXT
+            add(text, pos, stop, text_type, None)
+        if mark == -1:
+            break
+        pos = mark + 1
+        italic = not italic
+    if italic:
+        raise Exception("The markdown used has invalid syntax")
 
 def markdown_to_blocks(markdown):
+    if "\r" in markdown:
+        markdown = markdown.replace("\r\n", "\n")
     blocks = markdown.split('\n\n')
     cleaned_blocks = []
     for block in blocks:
@@ -109,36 +203,356 @@ def markdown_to_blocks(markdown):
         cleaned_blocks.append(cleaned)
     return cleaned_blocks
 
+def iter_markdown_blocks(lines):
+    # Streaming markdown_to_blocks: takes any iterable of lines (such as an
+    # open file) and yields each block as soon as the blank line after it is
+    # read, so only one block is ever held in memory.
+    block_lines = []
+    for line in lines:
+        line = line.rstrip("\r\n")
+        if line:
+            block_lines.append(line)
+            continue
+        block = "\n".join(block_lines).strip()
+        block_lines = []
+        if block:
+            yield block
+
+    block = "\n".join(block_lines).strip()
+    if block:
+        yield block
+
+# Mapped bytes are handed back to the kernel in steps of this size once every
+# block in them has been decoded, so resident memory stays bounded too.
+MAPPED_RELEASE_BYTES = 16 * 1024 * 1024
+# Block boundaries are searched for this many bytes at a time, so finding the
+# end of one block never pages in the rest of the file.
+MAPPED_SCAN_BYTES = 1024 * 1024
+# A blank line is "\n\n" once "\r\n" is normalized, so in the raw bytes it
+# is "\n\n" or "\n\r\n".
+BLOCK_SEPARATOR = re.compile(rb"\n\r?\n")
+
+def iter_mapped_blocks(path, encoding="utf-8"):
+    # markdown_to_blocks for a file on disk without reading it into memory:
+    # the file is memory-mapped, block boundaries are found by scanning the
+    # mapped bytes, and only one block at a time is decoded into a str. A
+    # UTF-8 multi-byte sequence never contains "\r" or "\n", so splitting
+    # the raw bytes can't cut a character in half.
+    with open(path, "rb") as source_file:
+        size = os.fstat(source_file.fileno()).st_size
+        if size == 0:
+            return
+        with mmap.mmap(source_file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            can_release = hasattr(mapped, "madvise") and hasattr(mmap, "MADV_DONTNEED")
+            if hasattr(mmap, "MADV_SEQUENTIAL"):
+                mapped.madvise(mmap.MADV_SEQUENTIAL)
+            start = released = 0
+            while True:
+                separator = _find_separator(mapped, start, size)
+                if separator is None:
+                    break
+                block = _decode_block(mapped[start:separator[0]], encoding)
+                if block:
+                    yield block
+                start = separator[1]
+                if can_release and start - released >= MAPPED_RELEASE_BYTES:
+                    boundary = start - start % mmap.PAGESIZE
+                    mapped.madvise(mmap.MADV_DONTNEED, released, boundary - released)
+                    released = boundary
+
+            block = _decode_block(mapped[start:], encoding)
+            if block:
+                yield block
+
+def _find_separator(mapped, start, size):
+    # Consecutive windows overlap by two bytes so a separator straddling the
+    # edge of one window is found in the next.
+    pos = start
+    while pos < size:
+        match = BLOCK_SEPARATOR.search(mapped, pos, pos + MAPPED_SCAN_BYTES)
+        if match:
+            return match.span()
+        pos += MAPPED_SCAN_BYTES - 2
+    return None
+
+def _decode_block(data, encoding):
+    block = data.decode(encoding)
+    if "\r" in block:
+        block = block.replace("\r\n", "\n")
+    return block.strip()
+
 def block_to_block_type(block):
-    lines = block.splitlines()
+    # Every block type is recognised by its first character, so that picks the
+    # one candidate type and the block is scanned once, only to confirm it.
+    first = block[:1]
 
     # Testing for Headings
-    i = 0
-    while i < len(block) and block[i] == '#':
-        i += 1
-    if 1 <= i <= 6 and len(block) > i and block[i] == ' ' and len(block.strip()) > i:
-        return BlockType.HEADING
-              
+    if first == '#':
+        i = 1
+        while i < len(block) and block[i] == '#':
+            i += 1
+        if i <= 6 and len(block) > i and block[i] == ' ' and len(block.strip()) > i:
+            return BlockType.HEADING
+        return BlockType.PARAGRAPH
+
     # Testing for Code
-    if len(lines) >= 3 and lines[0].startswith('```') and lines[-1].strip() == '```':
-        return BlockType.CODE
+    if first == '`':
+        if code_block_span(block) is not None:
+            return BlockType.CODE
+        return BlockType.PARAGRAPH
 
     # Testing for Quotes
-    if all(line.startswith('>') for line in lines):
-        return BlockType.QUOTE
+    if first == '>':
+        if all(line.startswith('>') for line in block.splitlines()):
+            return BlockType.QUOTE
+        return BlockType.PARAGRAPH
 
     # Testing for Unordered Lists
-    if all(line.startswith('- ') for line in lines):
-        return BlockType.UNORDERED_LIST
-    
+    if first == '-':
+        if all(line.startswith('- ') for line in block.splitlines()):
+            return BlockType.UNORDERED_LIST
+        return BlockType.PARAGRAPH
+
     # Testing for Ordered Lists
-    expected = 1
-    for line in lines:
-        if not line.startswith(f'{expected}. '):
-            break
-        expected += 1
-    if expected == len(lines) + 1:
+    if first == '1':
+        expected = 1
+        for line in block.splitlines():
+            if not line.startswith(f'{expected}. '):
+                return BlockType.PARAGRAPH
+            expected += 1
         return BlockType.ORDERED_LIST
-    
+
     # For anything else, there's Mastercard. Or a Paragraph type
-    return BlockType.PARAGRAPH
\ No newline at end of file
+    return BlockType.PARAGRAPH
+
+def code_block_span(block):
+    # Where the code in a fenced block starts and ends: past the opening
+    # fence's line and up to the closing fence's, or None if block isn't a
+    # fenced code block of at least three lines. Only the first and last
+    # lines are looked at, so a code block costs the same to recognise
+    # however much code it holds. Whitespace after the closing fence is
+    # ignored, without copying the block to strip it.
+    if not block.startswith('```'):
+        return None
+    stop = len(block)
+    while stop and block[stop - 1].isspace():
+        stop -= 1
+    start = block.find('\n') + 1
+    end = block.rfind('\n', 0, stop)
+    if start == 0 or end < start or block[end + 1:stop].strip() != '```':
+        return None
+    return start, end
+
+def code_block_text(block):
+    # The code a fenced block holds, copied out in one slice.
+    span = code_block_span(block)
+    if span is None:
+        raise ValueError("Block is not a fenced code block")
+    start, end = span
+    return block[start:end] + "\n"
+
+def classify_blocks(blocks):
+    return [block_to_block_type(block) for block in blocks]
+
+def textnodes_to_children(text_nodes):
+    return [text_node_to_html_node(node) for node in text_nodes]
+
+def block_inline_texts(block, block_type):
+    # The inline markdown a block holds: one string per list item, or one for
+    # the whole block. Code blocks hold none.
+    if block_type == BlockType.CODE:
+        return []
+    lines = block.splitlines()
+    match block_type:
+        case BlockType.HEADING:
+            level = len(block) - len(block.lstrip('#'))
+            return [block[level + 1:].strip()]
+        case BlockType.QUOTE:
+            return [" ".join(line.lstrip('>').strip() for line in lines)]
+        case BlockType.UNORDERED_LIST:
+            return [line[2:] for line in lines]
+        case BlockType.ORDERED_LIST:
+            return [line.split(". ", 1)[1] for line in lines]
+        case _:
+            return [" ".join(lines)]
+
+def parse_block(block, block_type):
+    return [text_to_textnodes(text) for text in block_inline_texts(block, block_type)]
+
+def parse_document(markdown):
+    # Everything parsing produces for a document, ready for build_block_node
+    # or build_block_html: a (block, block type, parse_block output) per block.
+    blocks = markdown_to_blocks(markdown)
+    return [(block, block_type, parse_block(block, block_type))
+            for block, block_type in zip(blocks, classify_blocks(blocks))]
+
+def block_needs_escaping(block, block_type):
+    # Every inline text and url is a piece of the block, so when the block
+    # has nothing to escape none of its inline nodes do either. A quote's own
+    # ">" markers don't count; dropping one per line is enough, as any left
+    # over only make the check err on the side of escaping.
+    if block_type == BlockType.QUOTE:
+        return needs_escaping(block[1:].replace("\n>", "\n"))
+    return needs_escaping(block)
+
+def inline_element(tag, text_nodes, escape=True):
+    # An element holding the given inline nodes. With none (an empty quote or
+    # list item, say) it still renders, as an empty element. With escape
+    # False the leaves are marked clean, so rendering skips checking them.
+    if not text_nodes:
+        return ParentNode(tag, [RawHTMLNode("")])
+    children = textnodes_to_children(text_nodes)
+    if not escape:
+        for child in children:
+            child.mark_clean()
+    return ParentNode(tag, children)
+
+def build_block_node(block, block_type, inline_nodes):
+    # Builds the HTMLNode for a block from its parse_block output.
+    if block_type == BlockType.CODE:
+        return ParentNode("pre", [LeafNode("code", code_block_text(block))])
+    escape = block_needs_escaping(block, block_type)
+    match block_type:
+        case BlockType.HEADING:
+            level = len(block) - len(block.lstrip('#'))
+            return inline_element(f"h{level}", inline_nodes[0], escape)
+        case BlockType.QUOTE:
+            return inline_element("blockquote", inline_nodes[0], escape)
+        case BlockType.UNORDERED_LIST:
+            return ParentNode("ul", [inline_element("li", nodes, escape) for nodes in inline_nodes])
+        case BlockType.ORDERED_LIST:
+            return ParentNode("ol", [inline_element("li", nodes, escape) for nodes in inline_nodes])
+        case _:
+            return inline_element("p", inline_nodes[0], escape)
+
+def build_block_html(block, block_type, inline_nodes):
+    # build_block_node(block, block_type, inline_nodes).to_html() without
+    # building the tree: inline nodes are rendered by text_nodes_to_html,
+    # skipping the per-node escaping for blocks with nothing to escape. Code
+    # is escaped as it is, in one go, with no check of the block first.
+    if block_type == BlockType.CODE:
+        return f"<pre><code>{escape_html(code_block_text(block))}</code></pre>"
+    escape = block_needs_escaping(block, block_type)
+    match block_type:
+        case BlockType.HEADING:
+            level = len(block) - len(block.lstrip('#'))
+            return f"<h{level}>{inline_html(inline_nodes[0], escape)}</h{level}>"
+        case BlockType.QUOTE:
+            return f"<blockquote>{inline_html(inline_nodes[0], escape)}</blockquote>"
+        case BlockType.UNORDERED_LIST:
+            return f"<ul>{''.join([f'<li>{inline_html(nodes, escape)}</li>' for nodes in inline_nodes])}</ul>"
+        case BlockType.ORDERED_LIST:
+            return f"<ol>{''.join([f'<li>{inline_html(nodes, escape)}</li>' for nodes in inline_nodes])}</ol>"
+        case _:
+            return f"<p>{inline_html(inline_nodes[0], escape)}</p>"
+
+def render_parsed(parsed_blocks):
+    # markdown_to_html for a parse_document result.
+    return f"<div>{''.join([build_block_html(*parsed_block) for parsed_block in parsed_blocks])}</div>"
+
+def inline_html(text_nodes, escape=True):
+    # An element with no inline nodes renders empty, as inline_element does.
+    return text_nodes_to_html(text_nodes, escape)
+
+def block_to_html_node(block):
+    block_type = block_to_block_type(block)
+    return build_block_node(block, block_type, parse_block(block, block_type))
+
+def markdown_to_html_node(markdown, cache=None):
+    children = []
+    for block in markdown_to_blocks(markdown):
+        if cache is None:
+            children.append(block_to_html_node(block))
+        else:
+            children.append(cache.get_html_node(block))
+    # An empty document (an empty file, or a page that is only front matter)
+    # is still a valid page, and renders as an empty div.
+    return ParentNode("div", children or [RawHTMLNode("")])
+
+def markdown_to_html(markdown, cache=None):
+    # Same output as markdown_to_html_node(markdown).to_html(), but rendered
+    # block by block with render_block, which skips building the tree. With a
+    # cache each unchanged block reuses its rendered HTML string.
+    if cache is None:
+        parts = [render_block(block) for block in markdown_to_blocks(markdown)]
+    else:
+        parts = [cache.get_html(block) for block in markdown_to_blocks(markdown)]
+    return f"<div>{''.join(parts)}</div>"
+
+def write_mapped_html(path, stream, cache=None):
+    # Renders a markdown file the way markdown_to_html would, writing each
+    # block's HTML to stream as soon as it is built. With iter_mapped_blocks
+    # neither the source nor the output is ever held in memory whole.
+    stream.write("<div>")
+    for block in iter_mapped_blocks(path):
+        if cache is None:
+            stream.write(render_block(block))
+        else:
+            stream.write(cache.get_html(block))
+    stream.write("</div>")
+
+def render_block(block):
+    block_type = block_to_block_type(block)
+    return build_block_html(block, block_type, parse_block(block, block_type))
+
+class BlockCache():
+    # LRU cache of built block subtrees and of their rendered HTML, keyed by
+    # a digest of the block text, so a cached block's source isn't kept
+    # alive with its output. Cached nodes are shared between documents, so
+    # callers must not mutate the trees markdown_to_html_node returns when a
+    # cache is used. Subtrees and HTML strings share one LRU order, bounded
+    # by max_blocks entries and by max_bytes, counting a subtree as its
+    # block's length and an HTML string as its own (characters, roughly).
+    def __init__(self, max_blocks=4096, max_bytes=64 * 1024 * 1024):
+        self.max_blocks = max_blocks
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.bytes = 0
+        # key -> (value, size)
+        self.entries = OrderedDict()
+
+    def get_html_node(self, block):
+        return self.lookup(b"n", block, block_to_html_node)
+
+    def get_html(self, block):
+        return self.lookup(b"h", block, render_block)
+
+    def lookup(self, kind, block, build):
+        key = kind + hashlib.blake2b(block.encode("utf-8"), digest_size=16).digest()
+        entry = self.entries.get(key)
+        if entry is not None:
+            self.hits += 1
+            self.entries.move_to_end(key)
+            return entry[0]
+
+        self.misses += 1
+        value = build(block)
+        size = len(value) if isinstance(value, str) else len(block)
+        self.entries[key] = (value, size)
+        self.bytes += size
+        while self.entries and (len(self.entries) > self.max_blocks or self.bytes > self.max_bytes):
+            _, (_, evicted_size) = self.entries.popitem(last=False)
+            self.bytes -= evicted_size
+        return value
+
+    def hit_rate(self):
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def stats(self):
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hit_rate(),
+            "size": len(self.entries),
+            "max_blocks": self.max_blocks,
+            "bytes": self.bytes,
+            "max_bytes": self.max_bytes,
+        }
+
+    def clear(self):
+        self.entries.clear()
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
\ No newline at end of file
@@ -0,0 +1,109 @@
+import hashlib
+import marshal
+import os
+
+from htmlnode import LeafNode, ParentNode, RawHTMLNode
+from markdown_parser import PARSER_VERSION, BlockType, markdown_to_html_node, parse_document
+from textnode import TEXT_TYPE_CODES, TEXT_TYPES, TextNode
+
+# Parse results as plain tuples of str, int and None, which marshal writes
+# and reads far faster than pickle handles node objects. Enum members are
+# stored as their index in TEXT_TYPES or these tuples; reordering an enum
+# changes what the parser produces, so it needs a PARSER_VERSION bump.
+BLOCK_TYPES = tuple(BlockType)
+BLOCK_TYPE_CODES = {block_type: code for code, block_type in enumerate(BLOCK_TYPES)}
+
+# First item of a node tuple.
+LEAF = 0
+PARENT = 1
+RAW = 2
+
+def text_nodes_to_tuple(text_nodes):
+    return tuple((node.text, TEXT_TYPE_CODES[node.text_type], node.url) for node in text_nodes)
+
+def text_nodes_from_tuple(data):
+    return [TextNode(text, TEXT_TYPES[code], url) for text, code, url in data]
+
+def node_to_tuple(node):
+    # (LEAF, tag, value, props), (PARENT, tag, children, props, memoize) or
+    # (RAW, html), with props as a tuple of (name, value) pairs or None.
+    props = tuple(node.props.items()) or None
+    if isinstance(node, ParentNode):
+        children = tuple(node_to_tuple(child) for child in node.children)
+        return (PARENT, node.tag, children, props, node.html_cache is not None)
+    if isinstance(node, LeafNode):
+        return (LEAF, node.tag, node.value, props)
+    if isinstance(node, RawHTMLNode):
+        return (RAW, node.raw_html())
+    raise TypeError(f"Can't serialize {type(node).__name__}")
+
+def node_from_tuple(data):
+    kind = data[0]
+    if kind == PARENT:
+        _, tag, children, props, memoize = data
+        props = dict(props) if props else None
+        return ParentNode(tag, [node_from_tuple(child) for child in children], props, memoize)
+    if kind == LEAF:
+        _, tag, value, props = data
+        return LeafNode(tag, value, dict(props) if props else None)
+    if kind == RAW:
+        return RawHTMLNode(data[1])
+    raise ValueError(f"Unknown node kind {kind!r}")
+
+def parsed_to_tuple(parsed_blocks):
+    return tuple((block, BLOCK_TYPE_CODES[block_type], tuple(text_nodes_to_tuple(nodes) for nodes in inline_nodes))
+                 for block, block_type, inline_nodes in parsed_blocks)
+
+def parsed_from_tuple(data):
+    return [(block, BLOCK_TYPES[code], [text_nodes_from_tuple(nodes) for nodes in inline_nodes])
+            for block, code, inline_nodes in data]
+
+
+class ParseCache():
+    # Parse results kept on disk, so a new process can load them instead of
+    # parsing again. Each entry is one marshal file named by a hash of the
+    # parser version and the markdown, so an edited page or a new parser
+    # version simply misses and writes a new entry; nothing is invalidated
+    # in place. Old entries are never removed: delete the directory to clear
+    # it. Entries are written atomically, so worker processes can share one.
+    def __init__(self, directory):
+        self.directory = directory
+        self.hits = 0
+        self.misses = 0
+
+    def entry_path(self, kind, markdown):
+        digest = hashlib.sha256(f"{PARSER_VERSION}:{kind}:".encode("utf-8") + markdown.encode("utf-8")).hexdigest()
+        return os.path.join(self.directory, digest[:2], digest[2:])
+
+    def get_parsed(self, markdown):
+        # parse_document(markdown), from the cache when possible.
+        return self.lookup("parsed", markdown, parse_document, parsed_to_tuple, parsed_from_tuple)
+
+    def get_html_node(self, markdown):
+        # markdown_to_html_node(markdown), from the cache when possible.
+        return self.lookup("tree", markdown, markdown_to_html_node, node_to_tuple, node_from_tuple)
+
+    def lookup(self, kind, markdown, build, encode, decode):
+        path = self.entry_path(kind, markdown)
+        try:
+            with open(path, "rb") as f:
+                value = decode(marshal.loads(f.read()))
+            self.hits += 1
+            return value
+        except FileNotFoundError:
+            pass
+        except (EOFError, ValueError, TypeError, IndexError, KeyError):
+            # A truncated or foreign file is treated as a miss and replaced.
+            pass
+
+        self.misses += 1
+        value = build(markdown)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        temp_path = f"{path}.{os.getpid()}.tmp"
+        with open(temp_path, "wb") as f:
+            f.write(marshal.dumps(encode(value)))
+        os.replace(temp_path, path)
+        return value
+
+    def stats(self):
+        return {"hits": self.hits, "misses": self.misses}
@@ -0,0 +1,91 @@
+import functools
+import time
+
+import htmlnode
+import markdown_parser
+
+# Every instrumented stage as (owner, attribute, stage name, counter). The
+# counter says what "produced" means: "result" counts the returned list (or
+# characters, for to_html), an int counts the calls made through the
+# callback passed as that positional argument, such as the tokenizers' add,
+# and None records nothing.
+STAGES = [
+    (markdown_parser, "markdown_to_blocks", "markdown_to_blocks", "result"),
+    (markdown_parser, "block_to_block_type", "block_to_block_type", None),
+    (markdown_parser, "block_to_html_node", "block_to_html_node", None),
+    (markdown_parser, "text_to_textnodes", "text_to_textnodes", "result"),
+    (markdown_parser, "_tokenize_images", "text_to_textnodes: images", 3),
+    (markdown_parser, "_tokenize_links", "text_to_textnodes: links", 3),
+    (markdown_parser, "_tokenize_emphasis", "text_to_textnodes: emphasis", 3),
+    (markdown_parser, "split_nodes_delimiter", "split_nodes_delimiter", "result"),
+    (markdown_parser, "split_nodes_image", "split_nodes_image", "result"),
+    (markdown_parser, "split_nodes_link", "split_nodes_link", "result"),
+    (markdown_parser, "text_node_to_html_node", "text_node_to_html_node", None),
+    (markdown_parser, "text_nodes_to_html", "text_nodes_to_html", None),
+    (markdown_parser, "render_block", "render_block (chars)", "result"),
+    (htmlnode.HTMLNode, "to_html", "to_html (chars)", "result"),
+]
+
+
+class Profile():
+    # Opt-in stage instrumentation. While a Profile is active (use it as a
+    # context manager) the stages above are swapped for wrappers recording
+    # call counts, cumulative time and what each call produced; on exit the
+    # originals are put back, so nothing is paid when profiling is off.
+    # Times are inclusive: a stage's total contains the stages it calls.
+    active = None
+
+    def __init__(self):
+        self.stats = {}
+        self.originals = []
+
+    def __enter__(self):
+        if Profile.active is not None:
+            raise RuntimeError("A Profile is already active")
+        for owner, attribute, name, counter in STAGES:
+            original = vars(owner)[attribute]
+            self.originals.append((owner, attribute, original))
+            setattr(owner, attribute, self.wrap(original, name, counter))
+        Profile.active = self
+        return self
+
+    def __exit__(self, *exc_info):
+        for owner, attribute, original in reversed(self.originals):
+            setattr(owner, attribute, original)
+        self.originals = []
+        Profile.active = None
+        return False
+
+    def wrap(self, func, name, counter):
+        # [calls, seconds, produced]; produced stays None for uncounted stages.
+        stats = self.stats.setdefault(name, [0, 0.0, None if counter is None else 0])
+        perf_counter = time.perf_counter
+
+        def counted(callback):
+            def counting_callback(*args, **kwargs):
+                stats[2] += 1
+                return callback(*args, **kwargs)
+            return counting_callback
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if isinstance(counter, int):
+                args = args[:counter] + (counted(args[counter]),) + args[counter + 1:]
+            start = perf_counter()
+            result = func(*args, **kwargs)
+            stats[1] += perf_counter() - start
+            stats[0] += 1
+            if counter == "result":
+                stats[2] += len(result)
+            return result
+
+        return wrapper
+
+    def report(self):
+        lines = [f"{'stage':<28} {'calls':>9} {'total ms':>10} {'us/call':>9} {'produced':>10}"]
+        for name, (calls, seconds, produced) in sorted(self.stats.items(), key=lambda item: -item[1][1]):
+            if not calls:
+                continue
+            produced = "-" if produced is None else produced
+            lines.append(f"{name:<28} {calls:>9} {seconds * 1000:>10.1f} {seconds / calls * 1e6:>9.2f} {produced:>10}")
+        return "\n".join(lines)
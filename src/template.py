@@ -0,0 +1,120 @@
+import os
+import re
+
+DEFAULT_TEMPLATE = "template.html"
+INCLUDE_PATTERN = re.compile(r'\{\{>\s*([^\s{}]+)\s*\}\}')
+SLOT_PATTERN = re.compile(r'\{\{ (Title|Content) \}\}')
+
+def split_front_matter(markdown):
+    # Pages may start with a "---" fenced block of "key: value" lines, such
+    # as "layout: post.html" to pick a template other than the default. The
+    # closing fence may also be the last line, with no newline after it.
+    if "\r" in markdown:
+        markdown = markdown.replace("\r\n", "\n")
+    if not markdown.startswith("---\n"):
+        return {}, markdown
+    end = markdown.find("\n---\n", 3)
+    if end == -1:
+        if not markdown.endswith("\n---"):
+            return {}, markdown
+        end = len(markdown) - 4
+
+    meta = {}
+    for line in markdown[4:end].splitlines():
+        key, separator, value = line.partition(":")
+        if separator:
+            meta[key.strip()] = value.strip()
+    return meta, markdown[end + 5:]
+
+def extract_title(markdown):
+    for line in markdown.splitlines():
+        if line.startswith("# "):
+            return line[2:].strip()
+    return None
+
+def load_template(templates_dir, name, used, including=()):
+    # Reads a template and expands its {{> partial }} includes, appending the
+    # name of every file read to `used` so callers know what the page
+    # depends on.
+    if name in including:
+        raise ValueError(f"Template include cycle: {' -> '.join(including + (name,))}")
+    if name not in used:
+        used.append(name)
+
+    with open(os.path.join(templates_dir, name), encoding="utf-8") as f:
+        text = f.read()
+
+    return INCLUDE_PATTERN.sub(
+        lambda match: load_template(templates_dir, match.group(1), used, including + (name,)),
+        text,
+    )
+
+def render_template(template, title, content):
+    return CompiledTemplate(template).render({"Title": title, "Content": content})
+
+class CompiledTemplate():
+    # A template parsed once into its literal segments and the {{ Title }} /
+    # {{ Content }} slots between them, so a page is rendered by joining the
+    # pieces rather than searching the whole template for each placeholder.
+    # There is always one more segment than there are slots. A slot's value
+    # is a string, or a node whose HTML is streamed in with write_html.
+    __slots__ = ("segments", "slots")
+
+    def __init__(self, text):
+        self.segments = []
+        self.slots = []
+        pos = 0
+        for match in SLOT_PATTERN.finditer(text):
+            self.segments.append(text[pos:match.start()])
+            self.slots.append(match.group(1))
+            pos = match.end()
+        self.segments.append(text[pos:])
+
+    def render(self, values):
+        parts = [self.segments[0]]
+        for slot, segment in zip(self.slots, self.segments[1:]):
+            value = values[slot]
+            parts.append(value if isinstance(value, str) else value.to_html())
+            parts.append(segment)
+        return "".join(parts)
+
+    def write(self, stream, values):
+        stream.write(self.segments[0])
+        for slot, segment in zip(self.slots, self.segments[1:]):
+            value = values[slot]
+            if isinstance(value, str):
+                stream.write(value)
+            else:
+                value.write_html(stream)
+            stream.write(segment)
+
+class TemplateCache():
+    # Compiled templates by name, each with the names of the template and
+    # partials it was built from. One cache serves a whole build: pages that
+    # share a layout share its compiled form, and worker processes are handed
+    # a preloaded cache once, when they start.
+    def __init__(self, templates_dir):
+        self.templates_dir = templates_dir
+        self.templates = {}
+
+    def get(self, name):
+        entry = self.templates.get(name)
+        if entry is None:
+            used = []
+            entry = (CompiledTemplate(load_template(self.templates_dir, name, used)), tuple(used))
+            self.templates[name] = entry
+        return entry
+
+    def preload(self):
+        # Compiles every file in the templates directory. One that can't be
+        # compiled, such as a partial in an include cycle or one including a
+        # file that doesn't exist, is left out here and fails only the pages
+        # that use it.
+        for root, _, files in os.walk(self.templates_dir):
+            for file_name in files:
+                name = os.path.relpath(os.path.join(root, file_name), self.templates_dir).replace(os.sep, "/")
+                try:
+                    self.get(name)
+                except (ValueError, OSError):
+                    pass
+        return self
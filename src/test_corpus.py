@@ -0,0 +1,34 @@
+import unittest
+
+from benchmarks.corpus import generate_corpus
+from markdown_parser import BlockType, classify_blocks, markdown_to_blocks, markdown_to_html, markdown_to_html_node
+
+
+class TestGenerateCorpus(unittest.TestCase):
+    def test_same_seed_same_corpus(self):
+        self.assertEqual(generate_corpus(5000, seed=7), generate_corpus(5000, seed=7))
+        self.assertNotEqual(generate_corpus(5000, seed=7), generate_corpus(5000, seed=8))
+
+    def test_reaches_requested_size(self):
+        self.assertGreaterEqual(len(generate_corpus(20000)), 20000)
+
+    def test_block_mix_is_respected(self):
+        markdown = generate_corpus(5000, block_mix={"code": 1})
+        self.assertEqual(set(classify_blocks(markdown_to_blocks(markdown))), {BlockType.CODE})
+
+    def test_corpus_parses_and_renders(self):
+        markdown = generate_corpus(50000, seed=3)
+        html = markdown_to_html_node(markdown).to_html()
+        self.assertTrue(html.startswith("<div>"))
+        self.assertIn("<a href=", html)
+        self.assertIn("<img src=", html)
+
+    def test_fused_rendering_matches_tree(self):
+        for seed in range(5):
+            markdown = generate_corpus(20000, seed=seed)
+            with self.subTest(seed=seed):
+                self.assertEqual(markdown_to_html(markdown), markdown_to_html_node(markdown).to_html())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,6 +1,8 @@
+import io
+import pickle
 import unittest
 
-from htmlnode import HTMLNode, LeafNode, ParentNode
+from htmlnode import HTMLNode, LeafNode, ParentNode, RawHTMLNode, escape_html
 
 class TestHTMLNode(unittest.TestCase):
     def test_url_eq(self):
@@ -67,6 +69,10 @@ class TestLeafNode(unittest.TestCase):
         with self.assertRaises(ValueError):
             node.to_html()
 
+    def test_leaf_void_tag_without_value(self):
+        node = LeafNode("img", "", {"src": "cat.png", "alt": "A cat"})
+        self.assertEqual(node.to_html(), '<img src="cat.png" alt="A cat">')
+
 class TestParentNode(unittest.TestCase):
     def test_to_html_with_children(self):
         child_node = LeafNode("span", "child")
@@ -99,5 +105,298 @@ class TestParentNode(unittest.TestCase):
         with self.assertRaises(ValueError):
             ParentNode("div", []).to_html()
 
+    def test_deeply_nested_tree(self):
+        node = LeafNode("b", "deep")
+        for _ in range(5000):
+            node = ParentNode("div", [node])
+        html = node.to_html()
+        self.assertEqual(html, "<div>" * 5000 + "<b>deep</b>" + "</div>" * 5000)
+
+    def test_nested_siblings_close_in_order(self):
+        inner = ParentNode("ul", [LeafNode("li", "one"), LeafNode("li", "two")])
+        outer = ParentNode("div", [LeafNode("p", "before"), inner, LeafNode("p", "after")])
+        self.assertEqual(
+            outer.to_html(),
+            "<div><p>before</p><ul><li>one</li><li>two</li></ul><p>after</p></div>",
+        )
+
+    def test_nested_parent_raises_no_children(self):
+        parent_node = ParentNode("div", [ParentNode("span", [LeafNode("b", "ok")]), ParentNode("p", [])])
+        with self.assertRaises(ValueError):
+            parent_node.to_html()
+
+class TestStreamingHTML(unittest.TestCase):
+    def test_leaf_iter_html(self):
+        node = LeafNode("b", "bold")
+        self.assertEqual(list(node.iter_html()), ["<b>bold</b>"])
+
+    def test_parent_iter_html_chunks(self):
+        parent_node = ParentNode("div", [LeafNode("span", "child"), LeafNode(None, "text")])
+        self.assertEqual(
+            list(parent_node.iter_html()),
+            ["<div>", "<span>child</span>", "text", "</div>"],
+        )
+
+    def test_write_html_matches_to_html(self):
+        grandchild_node = LeafNode("b", "grandchild")
+        child_node = ParentNode("span", [grandchild_node], {"class": "inner"})
+        parent_node = ParentNode("div", [child_node, LeafNode("i", "tail")])
+        stream = io.StringIO()
+        parent_node.write_html(stream)
+        self.assertEqual(stream.getvalue(), parent_node.to_html())
+        self.assertEqual(
+            stream.getvalue(),
+            '<div><span class="inner"><b>grandchild</b></span><i>tail</i></div>',
+        )
+
+    def test_write_html_raises_on_invalid_child(self):
+        parent_node = ParentNode("div", [ParentNode("p", [])])
+        with self.assertRaises(ValueError):
+            parent_node.write_html(io.StringIO())
+
+    def test_iter_html_not_implemented(self):
+        node = HTMLNode(tag="div")
+        with self.assertRaises(NotImplementedError):
+            list(node.iter_html())
+
+class TestCompactNodes(unittest.TestCase):
+    def test_nodes_have_no_instance_dict(self):
+        for node in (HTMLNode("div"), LeafNode("b", "bold"), ParentNode("p", [LeafNode("b", "bold")])):
+            with self.subTest(node=node):
+                self.assertFalse(hasattr(node, "__dict__"))
+
+    def test_leaves_share_empty_children_and_props(self):
+        first = LeafNode("b", "one")
+        second = LeafNode("i", "two")
+        self.assertIs(first.children, second.children)
+        self.assertIs(first.props, second.props)
+        self.assertEqual(first.children, [])
+        self.assertEqual(first.props, {})
+
+    def test_shared_empties_are_read_only(self):
+        node = LeafNode("b", "bold")
+        with self.assertRaises(TypeError):
+            node.props["class"] = "loud"
+        with self.assertRaises(TypeError):
+            node.children.append(LeafNode("i", "nested"))
+        self.assertEqual(LeafNode("i", "other").props, {})
+
+    def test_given_props_are_copied(self):
+        props = {"href": "https://example.com"}
+        node = LeafNode("a", "link", props)
+        props["href"] = "changed"
+        self.assertEqual(node.props, {"href": "https://example.com"})
+
+    def test_given_empty_containers_are_copied(self):
+        children = []
+        node = ParentNode("ul", children)
+        node.children.append(ParentNode("li", [LeafNode(None, "item")]))
+        self.assertEqual(children, [])
+        self.assertEqual(node.to_html(), "<ul><li>item</li></ul>")
+        leaf = LeafNode("b", "bold", {})
+        leaf.props["class"] = "loud"
+        self.assertEqual(leaf.to_html(), '<b class="loud">bold</b>')
+        html_node = HTMLNode("div", props={})
+        html_node.props["id"] = "main"
+        self.assertEqual(html_node.props_to_html(), ' id="main"')
+        self.assertIs(ParentNode("p", [leaf]).props, LeafNode("i", "x").props)
+
+
+
+class TestEscaping(unittest.TestCase):
+    def test_escape_html(self):
+        self.assertEqual(escape_html('<a href="x">Tom & Jerry</a>'), "&lt;a href=&quot;x&quot;&gt;Tom &amp; Jerry&lt;/a&gt;")
+        self.assertEqual(escape_html("&amp;"), "&amp;amp;")
+
+    def test_clean_text_is_returned_as_is(self):
+        text = "nothing to escape here, isn't there?"
+        self.assertIs(escape_html(text), text)
+
+    def test_leaf_value_is_escaped(self):
+        self.assertEqual(LeafNode("b", "1 < 2 & 3 > 2").to_html(), "<b>1 &lt; 2 &amp; 3 &gt; 2</b>")
+        self.assertEqual(LeafNode(None, "<script>").to_html(), "&lt;script&gt;")
+
+    def test_attribute_values_are_escaped(self):
+        node = LeafNode("a", "link", {"href": "/search?q=a&b", "title": 'say "hi"'})
+        self.assertEqual(node.to_html(), '<a href="/search?q=a&amp;b" title="say &quot;hi&quot;">link</a>')
+        image = LeafNode("img", "", {"src": "a.png", "alt": "<alt>"})
+        self.assertEqual(image.to_html(), '<img src="a.png" alt="&lt;alt&gt;">')
+
+    def test_non_string_attribute_values(self):
+        node = LeafNode("img", "x", {"width": 100, "hidden": True, "title": None})
+        self.assertEqual(node.to_html(), '<img width="100" hidden="True" title="None">')
+        self.assertEqual(LeafNode("td", "x", {"colspan": 2}).to_html(), '<td colspan="2">x</td>')
+
+    def test_non_string_leaf_values(self):
+        self.assertEqual(LeafNode("span", 5).to_html(), "<span>5</span>")
+        self.assertEqual(LeafNode(None, True).to_html(), "True")
+        self.assertEqual(ParentNode("p", [LeafNode("b", 1.5)]).to_html(), "<p><b>1.5</b></p>")
+        self.assertEqual(escape_html(7), "7")
+
+    def test_raw_node_is_not_escaped(self):
+        node = ParentNode("div", [RawHTMLNode("<em>trusted</em> & safe"), LeafNode(None, "<em>")])
+        self.assertEqual(node.to_html(), "<div><em>trusted</em> & safe&lt;em&gt;</div>")
+        out = io.StringIO()
+        node.write_html(out)
+        self.assertEqual(out.getvalue(), node.to_html())
+
+    def test_clean_mark_is_dropped_with_its_value(self):
+        leaf = LeafNode("b", "clean")
+        leaf.mark_clean()
+        self.assertEqual(ParentNode("p", [leaf]).to_html(), "<p><b>clean</b></p>")
+        leaf.value = "<script>"
+        self.assertEqual(ParentNode("p", [leaf]).to_html(), "<p><b>&lt;script&gt;</b></p>")
+        self.assertEqual(leaf.to_html(), "<b>&lt;script&gt;</b>")
+
+
+class TestRawHTMLNode(unittest.TestCase):
+    def test_str(self):
+        self.assertEqual(RawHTMLNode("<p>done</p>").to_html(), "<p>done</p>")
+
+    def test_empty_value(self):
+        node = ParentNode("div", [RawHTMLNode(""), LeafNode("b", "x")])
+        self.assertEqual(node.to_html(), "<div><b>x</b></div>")
+
+    def test_bytes(self):
+        fragment = "<p>caf\u00e9</p>".encode("utf-8")
+        self.assertEqual(RawHTMLNode(fragment).to_html(), "<p>caf\u00e9</p>")
+        self.assertEqual(RawHTMLNode(bytearray(b"<hr>")).to_html(), "<hr>")
+
+    def test_callable_is_called_once_on_first_render(self):
+        calls = []
+
+        def load():
+            calls.append(1)
+            return b"<nav>loaded</nav>"
+
+        node = RawHTMLNode(load)
+        self.assertEqual(calls, [])
+        tree = ParentNode("body", [node, LeafNode("p", "text")])
+        self.assertEqual(tree.to_html(), "<body><nav>loaded</nav><p>text</p></body>")
+        self.assertEqual(tree.to_html(), "<body><nav>loaded</nav><p>text</p></body>")
+        self.assertEqual(calls, [1])
+
+    def test_streamed_verbatim(self):
+        tree = ParentNode("div", [RawHTMLNode(lambda: "<i>a & b</i>"), RawHTMLNode(b"<br>")])
+        out = io.StringIO()
+        tree.write_html(out)
+        self.assertEqual(out.getvalue(), "<div><i>a & b</i><br></div>")
+
+    def test_inside_memoized_subtree(self):
+        raw = RawHTMLNode("<li>one</li>")
+        menu = ParentNode("ul", [raw], memoize=True)
+        self.assertEqual(menu.to_html(), "<ul><li>one</li></ul>")
+        raw.value = "<li>two</li>"
+        self.assertEqual(menu.to_html(), "<ul><li>two</li></ul>")
+
+    def test_invalid_values(self):
+        for value in (None, 42, lambda: None):
+            with self.subTest(value=value), self.assertRaises(TypeError):
+                RawHTMLNode(value).to_html()
+
+class TestMemoizedSubtrees(unittest.TestCase):
+    def make_nav(self):
+        return ParentNode("nav", [
+            ParentNode("ul", [
+                ParentNode("li", [LeafNode("a", "Home", {"href": "/"})]),
+                ParentNode("li", [LeafNode("a", "Blog", {"href": "/blog"})]),
+            ]),
+        ], memoize=True)
+
+    def page(self, nav, text):
+        return ParentNode("body", [nav, ParentNode("p", [LeafNode(None, text)])])
+
+    def test_renders_like_an_unmemoized_tree(self):
+        nav = self.make_nav()
+        plain = ParentNode("nav", nav.children)
+        self.assertEqual(nav.to_html(), plain.to_html())
+        self.assertEqual(self.page(nav, "x").to_html(), self.page(plain, "x").to_html())
+
+    def test_html_is_rendered_once(self):
+        nav = self.make_nav()
+        first = self.page(nav, "one").to_html()
+        cached = nav.html_cache
+        self.assertTrue(cached)
+        second = self.page(nav, "two").to_html()
+        self.assertIs(nav.html_cache, cached)
+        self.assertEqual(first.replace("one", "two"), second)
+
+    def test_leaf_change_invalidates_ancestors(self):
+        nav = self.make_nav()
+        page = self.page(nav, "text")
+        page.to_html()
+        leaf = nav.children[0].children[1].children[0]
+        leaf.value = "Posts"
+        self.assertEqual(nav.html_cache, "")
+        self.assertIn('<a href="/blog">Posts</a>', page.to_html())
+
+    def test_tag_and_props_changes_invalidate(self):
+        nav = self.make_nav()
+        nav.to_html()
+        nav.children[0].tag = "ol"
+        self.assertEqual(nav.to_html().count("<ol>"), 1)
+        nav.children[0].children[0].children[0].props["href"] = "/home"
+        self.assertIn('href="/home"', nav.to_html())
+        nav.props = {"class": "main"}
+        self.assertTrue(nav.to_html().startswith('<nav class="main">'))
+        nav.props["id"] = "top"
+        self.assertTrue(nav.to_html().startswith('<nav class="main" id="top">'))
+
+    def test_children_changes_invalidate(self):
+        nav = self.make_nav()
+        nav.to_html()
+        items = nav.children[0].children
+        items.append(ParentNode("li", [LeafNode("a", "About", {"href": "/about"})]))
+        self.assertIn("About", nav.to_html())
+        items.pop(0)
+        self.assertNotIn("Home", nav.to_html())
+        # Nodes added since the last render are tracked once it renders again.
+        items[-1].children[0].value = "Team"
+        self.assertIn("Team", nav.to_html())
+        nav.children[0].children = [ParentNode("li", [LeafNode(None, "only")])]
+        self.assertEqual(nav.to_html(), "<nav><ul><li>only</li></ul></nav>")
+
+    def test_nested_memoized_nodes(self):
+        inner = ParentNode("ul", [ParentNode("li", [LeafNode(None, "item")])], memoize=True)
+        outer = ParentNode("aside", [inner, LeafNode("p", "side")], memoize=True)
+        outer.to_html()
+        self.assertTrue(inner.html_cache)
+        inner.children[0].children[0].value = "changed"
+        self.assertEqual((inner.html_cache, outer.html_cache), ("", ""))
+        self.assertEqual(outer.to_html(), "<aside><ul><li>changed</li></ul><p>side</p></aside>")
+
+    def test_shared_subtree_changes_reach_every_page(self):
+        nav = self.make_nav()
+        pages = [self.page(nav, f"page {i}") for i in range(3)]
+        [page.to_html() for page in pages]
+        nav.children[0].children[0].children[0].value = "Start"
+        for page in pages:
+            self.assertIn(">Start</a>", page.to_html())
+
+    def test_streaming(self):
+        nav = self.make_nav()
+        nav.to_html()
+        out = io.StringIO()
+        self.page(nav, "text").write_html(out)
+        self.assertEqual(out.getvalue(), self.page(nav, "text").to_html())
+
+    def test_unmemoized_trees_are_left_alone(self):
+        leaf = LeafNode("b", "bold")
+        node = ParentNode("p", [leaf])
+        node.to_html()
+        self.assertIs(type(node), ParentNode)
+        self.assertIs(type(leaf), LeafNode)
+        self.assertIsNone(node.html_cache)
+        self.assertIsNone(leaf.watchers)
+
+    def test_pickled_copy_is_untracked(self):
+        nav = self.make_nav()
+        html = nav.to_html()
+        copy = pickle.loads(pickle.dumps(nav))
+        self.assertIs(type(copy), ParentNode)
+        self.assertIs(type(copy.children[0].children), list)
+        self.assertEqual(copy.html_cache, "")
+        self.assertEqual(copy.to_html(), html)
+
 if __name__ == "__main__":
     unittest.main()
\ No newline at end of file
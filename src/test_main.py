@@ -0,0 +1,306 @@
+import io
+import json
+import os
+import re
+import tempfile
+import threading
+import time
+import unittest
+from contextlib import redirect_stdout
+
+from main import MANIFEST_NAME, PageError, build, find_pages, load_manifest, snapshot, watch
+
+
+class SiteTestCase(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.content_dir = os.path.join(self.tmp.name, "content")
+        self.output_dir = os.path.join(self.tmp.name, "public")
+        self.write_page("index.md", "# Home\n\nWelcome to the **site**")
+        self.write_page("blog/first.md", "- one\n- two")
+        self.write_page("blog/notes.txt", "not markdown")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def write_page(self, relative_path, markdown):
+        path = os.path.join(self.content_dir, relative_path)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(markdown)
+
+    def read_output(self, relative_path):
+        with open(os.path.join(self.output_dir, relative_path), encoding="utf-8") as f:
+            return f.read()
+
+
+class TestBuild(SiteTestCase):
+    def test_find_pages_maps_md_to_html(self):
+        pages = find_pages(self.content_dir, self.output_dir)
+        self.assertEqual(
+            pages,
+            [
+                (os.path.join(self.content_dir, "index.md"), os.path.join(self.output_dir, "index.html")),
+                (os.path.join(self.content_dir, "blog", "first.md"), os.path.join(self.output_dir, "blog", "first.html")),
+            ],
+        )
+
+    def test_build_writes_html(self):
+        self.assertEqual(build(self.content_dir, self.output_dir), 2)
+        self.assertEqual(self.read_output("index.html"), "<div><h1>Home</h1><p>Welcome to the <b>site</b></p></div>")
+        self.assertEqual(self.read_output("blog/first.html"), "<div><ul><li>one</li><li>two</li></ul></div>")
+
+    def test_trace_has_stage_spans_per_page(self):
+        trace_path = os.path.join(self.tmp.name, "trace.json")
+        build(self.content_dir, self.output_dir, trace_path=trace_path)
+        self.assertEqual(self.read_output("index.html"), "<div><h1>Home</h1><p>Welcome to the <b>site</b></p></div>")
+        with open(trace_path, encoding="utf-8") as f:
+            events = [event for event in json.load(f)["traceEvents"] if event["ph"] == "X"]
+        names = [event["name"] for event in events]
+        for stage in ("read", "block split", "classify", "inline parse", "render", "write", "page"):
+            self.assertEqual(names.count(stage), 2, stage)
+        pages = sorted(event["args"]["source"] for event in events if event["name"] == "page")
+        self.assertEqual(pages, sorted(source for source, _ in find_pages(self.content_dir, self.output_dir)))
+        self.assertEqual({event["pid"] for event in events}, {os.getpid()})
+
+    def test_output_is_escaped(self):
+        self.write_page("index.md", "# Fish & Chips\n\nUse `<br>` for a [break](/a?b=1&c=2)")
+        build(self.content_dir, self.output_dir)
+        self.assertEqual(
+            self.read_output("index.html"),
+            '<div><h1>Fish &amp; Chips</h1><p>Use <code>&lt;br&gt;</code> for a <a href="/a?b=1&amp;c=2">break</a></p></div>',
+        )
+
+    def test_empty_pages_build(self):
+        self.write_page("empty.md", "")
+        self.write_page("meta.md", "---\nlayout: template.html\n---\n")
+        self.write_page("quote.md", "# Quote\n\n>")
+        for jobs in (1, 2):
+            with self.subTest(jobs=jobs):
+                self.assertEqual(build(self.content_dir, self.output_dir, jobs=jobs), 5)
+                self.assertEqual(self.read_output("empty.html"), "<div></div>")
+                self.assertEqual(self.read_output("meta.html"), "<div></div>")
+                self.assertEqual(self.read_output("quote.html"), "<div><h1>Quote</h1><blockquote></blockquote></div>")
+                self.assertEqual(self.read_output("index.html"), "<div><h1>Home</h1><p>Welcome to the <b>site</b></p></div>")
+
+    def test_parallel_build_matches_serial(self):
+        for i in range(10):
+            self.write_page(f"many/page{i}.md", f"Page number {i}")
+        self.assertEqual(build(self.content_dir, self.output_dir, jobs=2), 12)
+        for i in range(10):
+            self.assertEqual(self.read_output(f"many/page{i}.html"), f"<div><p>Page number {i}</p></div>")
+
+    def test_parse_cache_is_filled_then_used(self):
+        parse_cache_dir = os.path.join(self.tmp.name, "parse-cache")
+        build(self.content_dir, self.output_dir, parse_cache_dir=parse_cache_dir)
+        entries = [name for _, _, names in os.walk(parse_cache_dir) for name in names]
+        self.assertEqual(len(entries), 2)
+        os.remove(os.path.join(self.output_dir, "index.html"))
+        build(self.content_dir, self.output_dir, jobs=2, parse_cache_dir=parse_cache_dir)
+        self.assertEqual(self.read_output("index.html"), "<div><h1>Home</h1><p>Welcome to the <b>site</b></p></div>")
+        self.assertEqual(self.read_output("blog/first.html"), "<div><ul><li>one</li><li>two</li></ul></div>")
+        self.assertEqual(sorted(name for _, _, names in os.walk(parse_cache_dir) for name in names), sorted(entries))
+
+
+class TestIncrementalBuild(SiteTestCase):
+    def test_first_build_converts_everything(self):
+        self.assertEqual(build(self.content_dir, self.output_dir, incremental=True), 2)
+        entries = load_manifest(os.path.join(self.output_dir, MANIFEST_NAME))["pages"]
+        self.assertEqual(sorted(entries), [os.path.join("blog", "first.md"), "index.md"])
+        self.assertEqual(entries["index.md"]["output"], "index.html")
+
+    def test_noop_rebuild_converts_nothing(self):
+        build(self.content_dir, self.output_dir, incremental=True)
+        self.assertEqual(build(self.content_dir, self.output_dir, incremental=True), 0)
+
+    def test_only_changed_page_is_rebuilt(self):
+        build(self.content_dir, self.output_dir, incremental=True)
+        self.write_page("index.md", "# Home\n\nNew _text_")
+        self.assertEqual(build(self.content_dir, self.output_dir, incremental=True), 1)
+        self.assertEqual(self.read_output("index.html"), "<div><h1>Home</h1><p>New <i>text</i></p></div>")
+
+    def test_touched_but_unchanged_page_is_skipped(self):
+        build(self.content_dir, self.output_dir, incremental=True)
+        path = os.path.join(self.content_dir, "index.md")
+        os.utime(path, ns=(0, 0))
+        self.assertEqual(build(self.content_dir, self.output_dir, incremental=True), 0)
+        entries = load_manifest(os.path.join(self.output_dir, MANIFEST_NAME))["pages"]
+        self.assertEqual(entries["index.md"]["mtime_ns"], 0)
+
+    def test_missing_output_is_rebuilt(self):
+        build(self.content_dir, self.output_dir, incremental=True)
+        os.remove(os.path.join(self.output_dir, "index.html"))
+        self.assertEqual(build(self.content_dir, self.output_dir, incremental=True), 1)
+        self.assertTrue(os.path.exists(os.path.join(self.output_dir, "index.html")))
+
+    def test_removed_source_deletes_output(self):
+        build(self.content_dir, self.output_dir, incremental=True)
+        os.remove(os.path.join(self.content_dir, "blog", "first.md"))
+        self.assertEqual(build(self.content_dir, self.output_dir, incremental=True), 0)
+        self.assertFalse(os.path.exists(os.path.join(self.output_dir, "blog", "first.html")))
+        entries = load_manifest(os.path.join(self.output_dir, MANIFEST_NAME))["pages"]
+        self.assertEqual(list(entries), ["index.md"])
+
+
+class TestTemplateDependencies(SiteTestCase):
+    def setUp(self):
+        super().setUp()
+        self.templates_dir = os.path.join(self.tmp.name, "templates")
+        self.write_template("template.html", "<title>{{ Title }}</title>{{> nav.html }}{{ Content }}")
+        self.write_template("post.html", "<article>{{> sidebar.html }}{{ Content }}</article>")
+        self.write_template("nav.html", "<nav>home</nav>")
+        self.write_template("sidebar.html", "<aside>links</aside>")
+        self.write_page("blog/first.md", "---\nlayout: post.html\n---\n- one\n- two")
+
+    def write_template(self, name, text):
+        path = os.path.join(self.templates_dir, name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(text)
+
+    def build(self):
+        output = io.StringIO()
+        with redirect_stdout(output):
+            count = build(self.content_dir, self.output_dir, incremental=True,
+                          templates_dir=self.templates_dir, explain=True)
+        return count, output.getvalue().splitlines()
+
+    def test_pages_are_wrapped_in_their_layout(self):
+        self.build()
+        self.assertEqual(
+            self.read_output("index.html"),
+            "<title>Home</title><nav>home</nav><div><h1>Home</h1><p>Welcome to the <b>site</b></p></div>",
+        )
+        self.assertEqual(
+            self.read_output("blog/first.html"),
+            "<article><aside>links</aside><div><ul><li>one</li><li>two</li></ul></div></article>",
+        )
+
+    def test_title_is_escaped(self):
+        self.write_page("index.md", "# Fish & Chips")
+        self.build()
+        self.assertTrue(self.read_output("index.html").startswith("<title>Fish &amp; Chips</title>"))
+
+    def test_unused_broken_partial_does_not_fail_parallel_build(self):
+        self.write_template("broken.html", "{{> missing.html }}")
+        self.write_page("second.md", "Second page")
+        self.build()
+        serial = self.read_output("index.html")
+        os.remove(os.path.join(self.output_dir, "index.html"))
+        build(self.content_dir, self.output_dir, jobs=2, templates_dir=self.templates_dir)
+        self.assertEqual(self.read_output("index.html"), serial)
+
+    def test_parallel_build_with_templates_matches_serial(self):
+        for i in range(10):
+            self.write_page(f"many/page{i}.md", f"---\nlayout: post.html\n---\nPage number {i}")
+        build(self.content_dir, self.output_dir, templates_dir=self.templates_dir)
+        serial = {key: self.read_output(key) for key in ("index.html", "blog/first.html", "many/page7.html")}
+        build(self.content_dir, self.output_dir, jobs=2, templates_dir=self.templates_dir)
+        self.assertEqual({key: self.read_output(key) for key in serial}, serial)
+        self.assertEqual(serial["many/page7.html"], "<article><aside>links</aside><div><p>Page number 7</p></div></article>")
+
+    def test_manifest_records_templates_used(self):
+        self.build()
+        entries = load_manifest(os.path.join(self.output_dir, MANIFEST_NAME))["pages"]
+        self.assertEqual(entries["index.md"]["templates"], ["template.html", "nav.html"])
+        self.assertEqual(entries[os.path.join("blog", "first.md")]["templates"], ["post.html", "sidebar.html"])
+
+    def test_partial_change_rebuilds_only_dependents(self):
+        self.build()
+        self.write_template("sidebar.html", "<aside>new links</aside>")
+        count, explanation = self.build()
+        self.assertEqual(count, 1)
+        self.assertEqual(explanation, [f"rebuilt {os.path.join('blog', 'first.md')}: template changed: sidebar.html"])
+        self.assertIn("new links", self.read_output("blog/first.html"))
+
+    def test_unused_template_change_rebuilds_nothing(self):
+        self.build()
+        self.write_template("unused.html", "{{ Content }}")
+        self.assertEqual(self.build(), (0, []))
+
+    def test_explain_reasons(self):
+        count, explanation = self.build()
+        self.assertEqual(count, 2)
+        self.assertEqual(
+            sorted(explanation),
+            [f"rebuilt {os.path.join('blog', 'first.md')}: new page", "rebuilt index.md: new page"],
+        )
+        self.write_page("index.md", "# Home\n\nEdited")
+        os.remove(os.path.join(self.content_dir, "blog", "first.md"))
+        self.assertEqual(
+            self.build()[1],
+            ["rebuilt index.md: source changed", f"removed {os.path.join('blog', 'first.html')}: source deleted"],
+        )
+
+    def test_switching_templates_dir_rebuilds_everything(self):
+        build(self.content_dir, self.output_dir, incremental=True)
+        count, explanation = self.build()
+        self.assertEqual(count, 2)
+        self.assertIn("rebuilt index.md: templates directory changed", explanation)
+
+
+class TestWatch(SiteTestCase):
+    def test_snapshot_sees_edits(self):
+        before = snapshot(self.content_dir, None)
+        self.assertEqual(len(before), 3)
+        self.write_page("index.md", "# Home\n\nChanged text")
+        self.assertNotEqual(snapshot(self.content_dir, None), before)
+
+    def test_watch_rebuilds_edited_page(self):
+        output = io.StringIO()
+        thread = threading.Thread(
+            target=watch,
+            args=(self.content_dir, self.output_dir),
+            kwargs={"interval": 0.01, "debounce": 0.01, "rebuilds": 1},
+        )
+        with redirect_stdout(output):
+            thread.start()
+            index_path = os.path.join(self.output_dir, "index.html")
+            while not os.path.exists(index_path):
+                time.sleep(0.01)
+            self.write_page("index.md", "# Home\n\nEdited while watching")
+            thread.join(timeout=10)
+
+        self.assertFalse(thread.is_alive())
+        self.assertEqual(self.read_output("index.html"), "<div><h1>Home</h1><p>Edited while watching</p></div>")
+        self.assertIn("Rebuilt 1 pages", output.getvalue())
+
+    def test_watch_survives_invalid_markdown(self):
+        output = io.StringIO()
+        self.write_page("index.md", "# Home\n\nAn _unclosed emphasis")
+        thread = threading.Thread(
+            target=watch,
+            args=(self.content_dir, self.output_dir),
+            kwargs={"interval": 0.01, "debounce": 0.01, "rebuilds": 2},
+        )
+        first_path = os.path.join(self.output_dir, "blog", "first.html")
+        with redirect_stdout(output):
+            thread.start()
+            while "Watching" not in output.getvalue():
+                time.sleep(0.01)
+            self.write_page("index.md", "# Home\n\nStill **unclosed")
+            while "Rebuild failed" not in output.getvalue():
+                time.sleep(0.01)
+            self.write_page("index.md", "# Home\n\nFixed _now_")
+            thread.join(timeout=10)
+
+        self.assertFalse(thread.is_alive())
+        index_path = os.path.join(self.content_dir, "index.md")
+        self.assertIn(f"Build failed: {index_path}: ", output.getvalue())
+        self.assertIn(f"Rebuild failed: {index_path}: ", output.getvalue())
+        self.assertTrue(os.path.exists(first_path))
+        self.assertEqual(self.read_output("index.html"), "<div><h1>Home</h1><p>Fixed <i>now</i></p></div>")
+
+
+class TestPageErrors(SiteTestCase):
+    def test_error_names_page(self):
+        self.write_page("blog/first.md", "Some **unclosed text")
+        path = os.path.join(self.content_dir, "blog", "first.md")
+        with self.assertRaisesRegex(PageError, f"^{re.escape(path)}: "):
+            build(self.content_dir, self.output_dir)
+        with self.assertRaisesRegex(PageError, f"^{re.escape(path)}: "):
+            build(self.content_dir, self.output_dir, jobs=2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,5 +1,10 @@
+import io
+import os
+import random
+import tempfile
 import unittest
-from textnode import TextNode, TextType
+import markdown_parser
+from textnode import SourceTextNode, TextNode, TextNodeArray, TextType, text_node_to_html_node, text_nodes_to_html
 from markdown_parser import (
     BlockType,
     split_nodes_delimiter, 
@@ -9,7 +14,20 @@ from markdown_parser import (
     split_nodes_link,
     text_to_textnodes,
     markdown_to_blocks,
-    block_to_block_type
+    iter_markdown_blocks,
+    iter_mapped_blocks,
+    write_mapped_html,
+    block_to_block_type,
+    classify_blocks,
+    markdown_to_html_node,
+    markdown_to_html,
+    BlockCache,
+    block_to_html_node,
+    inline_html,
+    render_block,
+    code_block_span,
+    code_block_text,
+    block_inline_texts,
 )
 
 
@@ -628,6 +646,15 @@ class TestSplitNodesLink(unittest.TestCase):
         self.assertEqual(result[2].text_type, TextType.LINK)
         self.assertEqual(result[2].text, "second")
 
+    def test_many_links_keep_order(self):
+        """Test that a long run of links is split in text order."""
+        text = " ".join(f"[l{i}](u{i})" for i in range(500))
+        result = split_nodes_link([TextNode(text, TextType.TEXT)])
+        links = [n for n in result if n.text_type == TextType.LINK]
+        self.assertEqual(len(links), 500)
+        self.assertEqual(links[0], TextNode("l0", TextType.LINK, "u0"))
+        self.assertEqual(links[-1], TextNode("l499", TextType.LINK, "u499"))
+        self.assertEqual(len(result), 999)
 
 class TestMixedContentProcessing(unittest.TestCase):
     """Test cases for processing mixed content with both images and links."""
@@ -976,6 +1003,121 @@ This is the same paragraph on a new line
         blocks = markdown_to_blocks(md)
         self.assertEqual(blocks, [])
 
+class TestIterMarkdownBlocks(unittest.TestCase):
+    """Test cases for streaming blocks from a file or lines."""
+
+    def test_blocks_from_file_object(self):
+        """Test splitting a file object into blocks."""
+        md = "# Heading\n\nParagraph line one\nline two\n\n- item 1\n- item 2\n"
+        blocks = list(iter_markdown_blocks(io.StringIO(md)))
+        self.assertEqual(blocks, ["# Heading", "Paragraph line one\nline two", "- item 1\n- item 2"])
+
+    def test_yields_before_reading_the_rest(self):
+        """Test that a block is yielded before later lines are read."""
+        lines = iter(["first block\n", "\n", "second block\n"])
+        blocks = iter_markdown_blocks(lines)
+        self.assertEqual(next(blocks), "first block")
+        self.assertEqual(next(lines), "second block\n")
+
+    def test_crlf_line_endings(self):
+        """Test that CRLF line endings split like LF ones."""
+        md = "Block 1\r\nstill 1\r\n\r\n\r\n\r\nBlock 2\r\n"
+        blocks = list(iter_markdown_blocks(io.StringIO(md, newline="")))
+        self.assertEqual(blocks, ["Block 1\nstill 1", "Block 2"])
+        self.assertEqual(markdown_to_blocks(md), blocks)
+
+    def test_matches_markdown_to_blocks(self):
+        """Test random documents against markdown_to_blocks."""
+        rng = random.Random(42)
+        pieces = ["text", "  ", "\n", "\n\n", "\n\n\n", "- item", "# head", " \n"]
+        for _ in range(500):
+            md = "".join(rng.choice(pieces) for _ in range(rng.randint(0, 20)))
+            with self.subTest(md=md):
+                self.assertEqual(list(iter_markdown_blocks(io.StringIO(md))), markdown_to_blocks(md))
+
+class TestIterMappedBlocks(unittest.TestCase):
+    """Test cases for reading blocks from a memory-mapped file."""
+
+    def setUp(self):
+        """Create a temporary directory for the page."""
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.path = os.path.join(self.tmp.name, "page.md")
+
+    def write(self, data):
+        """Write the page's raw bytes."""
+        with open(self.path, "wb") as f:
+            f.write(data)
+
+    def test_blocks(self):
+        """Test splitting a file into blocks."""
+        self.write(b"# Heading\n\nParagraph line one\nline two\n\n\n\n- item 1\n- item 2\n")
+        blocks = list(iter_mapped_blocks(self.path))
+        self.assertEqual(blocks, ["# Heading", "Paragraph line one\nline two", "- item 1\n- item 2"])
+
+    def test_empty_file(self):
+        """Test that an empty file has no blocks."""
+        self.write(b"")
+        self.assertEqual(list(iter_mapped_blocks(self.path)), [])
+
+    def test_decodes_utf8(self):
+        """Test that multi-byte UTF-8 text is decoded."""
+        md = "Caf\u00e9 \u2014 na\u00efve\n\n\U0001F600 emoji"
+        self.write(md.encode("utf-8"))
+        self.assertEqual(list(iter_mapped_blocks(self.path)), markdown_to_blocks(md))
+
+    def test_matches_markdown_to_blocks(self):
+        """Test random documents against markdown_to_blocks."""
+        rng = random.Random(7)
+        pieces = ["text", "  ", "\n", "\r\n", "\r", "\n\n", "\r\n\r\n", "\n\r\n", "- item", "\u00e9", " \n"]
+        for _ in range(500):
+            md = "".join(rng.choice(pieces) for _ in range(rng.randint(0, 20)))
+            with self.subTest(md=md):
+                self.write(md.encode("utf-8"))
+                self.assertEqual(list(iter_mapped_blocks(self.path)), markdown_to_blocks(md))
+
+    def test_releases_pages_without_losing_blocks(self):
+        """Test releasing mapped pages as blocks are consumed."""
+        old_step = markdown_parser.MAPPED_RELEASE_BYTES
+        markdown_parser.MAPPED_RELEASE_BYTES = 1
+        self.addCleanup(setattr, markdown_parser, "MAPPED_RELEASE_BYTES", old_step)
+        md = "\n\n".join(f"Paragraph {i} " + "x" * 1000 for i in range(50))
+        self.write(md.encode("utf-8"))
+        self.assertEqual(list(iter_mapped_blocks(self.path)), markdown_to_blocks(md))
+
+    def test_separators_across_scan_windows(self):
+        """Test separators that straddle two scan windows."""
+        old_step = markdown_parser.MAPPED_SCAN_BYTES
+        markdown_parser.MAPPED_SCAN_BYTES = 3
+        self.addCleanup(setattr, markdown_parser, "MAPPED_SCAN_BYTES", old_step)
+        for md in ("ab\r\n\r\ncd", "a\n\nb\n\r\nc", "abcd\n\r\nef\r\n\n\ngh", "long block with no separator"):
+            with self.subTest(md=md):
+                self.write(md.encode("utf-8"))
+                self.assertEqual(list(iter_mapped_blocks(self.path)), markdown_to_blocks(md))
+
+    def test_closing_early(self):
+        """Test closing the generator before the last block."""
+        self.write(b"one\n\ntwo\n\nthree")
+        blocks = iter_mapped_blocks(self.path)
+        self.assertEqual(next(blocks), "one")
+        blocks.close()
+
+    def test_write_mapped_html(self):
+        """Test writing a mapped file's HTML to a stream."""
+        md = "# Title\r\n\r\nSome **bold** text\r\n\r\n- a\r\n- b"
+        self.write(md.encode("utf-8"))
+        for cache in (None, BlockCache()):
+            out = io.StringIO()
+            write_mapped_html(self.path, out, cache)
+            self.assertEqual(out.getvalue(), markdown_to_html(md))
+
+    def test_write_mapped_html_empty(self):
+        """Test writing the HTML of a file with no blocks."""
+        self.write(b"\n\n")
+        stream = io.StringIO()
+        write_mapped_html(self.path, stream)
+        self.assertEqual(stream.getvalue(), "<div></div>")
+
 class TestBlockToBlockType(unittest.TestCase):
     def test_headings(self):
         self.assertEqual(block_to_block_type("# A valid heading"), BlockType.HEADING)
@@ -1013,6 +1155,366 @@ class TestBlockToBlockType(unittest.TestCase):
     def test_paragraphs(self):
         self.assertEqual(block_to_block_type("This is a simple paragraph."), BlockType.PARAGRAPH)
         self.assertEqual(block_to_block_type("1. list\n- not a list"), BlockType.PARAGRAPH, "Mixed types should be a paragraph")
+        self.assertEqual(block_to_block_type("- item\n> quote"), BlockType.PARAGRAPH, "Mixed types should be a paragraph")
+        self.assertEqual(block_to_block_type("-item"), BlockType.PARAGRAPH)
+        self.assertEqual(block_to_block_type("10. item"), BlockType.PARAGRAPH)
+        self.assertEqual(block_to_block_type(""), BlockType.PARAGRAPH)
+
+    def test_classify_blocks(self):
+        blocks = [
+            "# Heading",
+            "```\ncode\n```",
+            "> quote",
+            "- item",
+            "1. item\n2. item",
+            "Just text",
+        ]
+        self.assertEqual(
+            classify_blocks(blocks),
+            [
+                BlockType.HEADING,
+                BlockType.CODE,
+                BlockType.QUOTE,
+                BlockType.UNORDERED_LIST,
+                BlockType.ORDERED_LIST,
+                BlockType.PARAGRAPH,
+            ],
+        )
+        self.assertEqual(classify_blocks([]), [])
+
+class TestTextToTextnodesMatchesPipeline(unittest.TestCase):
+    """Test that the single-pass text_to_textnodes matches the five-pass split pipeline."""
+
+    SAMPLES = [
+        "This is **bold** and _italic_ text with `code` and ![img](url) and [link](url)",
+        "Text with `code with **bold** and [link](url)` more text",
+        "`code` with ![img](url) and [link](url) and **bold** and _italic_",
+        "Text with ![](url) and ![alt](url) and [](url) and [link](url)",
+        "Text with [](url) and [link](url)",
+        "![img](url)[link](url)**bold**_italic_`code`",
+        "Text with single _ underscore and **bold** and single * asterisk",
+        "First ![img](url) second [link](url) third **bold** fourth _italic_ fifth `code`",
+        "Text with **bold <>&\"'** and _italic <>&\"'_ and `code <>&\"'`",
+        "![img1](url1)![img2](url2)[link1](url1)[link2](url2)**bold1****bold2**",
+        "![img](url)[link](url)**bold**_italic_`code`![img](url)[link](url)",
+        "First ![same](url) middle ![same](url) last",
+        "This is just plain text with no markdown",
+        "",
+    ]
+
+    PIECES = [
+        "plain", " ", "words here", "`", "**", "_", "!", "[", "]", "(", ")",
+        "![alt](img.png)", "![](empty.png)", "[link](https://example.com)",
+        "[](nowhere)", "`code`", "**bold**", "_italic_", "[a](b![c](d)",
+    ]
+
+    def five_pass(self, text):
+        """Split text the old way, one split_nodes_* pass per syntax."""
+        nodes = [TextNode(text, TextType.TEXT)]
+        nodes = split_nodes_delimiter(nodes, "`", TextType.CODE)
+        nodes = split_nodes_image(nodes)
+        nodes = split_nodes_link(nodes)
+        nodes = split_nodes_delimiter(nodes, "**", TextType.BOLD)
+        return split_nodes_delimiter(nodes, "_", TextType.ITALIC)
+
+    def assert_same_output(self, text):
+        """Assert every text_to_textnodes form matches the pipeline, errors included."""
+        try:
+            expected = self.five_pass(text)
+        except Exception:
+            with self.assertRaises(Exception):
+                text_to_textnodes(text)
+            with self.assertRaises(Exception):
+                text_to_textnodes(text, offsets=True)
+            with self.assertRaises(Exception):
+                text_to_textnodes(text, columnar=True)
+            return
+        self.assertEqual(text_to_textnodes(text), expected)
+        self.assertEqual(text_to_textnodes(text, offsets=True), expected)
+        self.assertEqual(text_to_textnodes(text, columnar=True), expected)
+
+    def test_existing_samples(self):
+        """Test the hand-written samples."""
+        for text in self.SAMPLES:
+            with self.subTest(text=text):
+                self.assert_same_output(text)
+
+    def test_randomized_corpus(self):
+        """Test random mixes of markdown syntax pieces."""
+        rng = random.Random(1234)
+        for _ in range(3000):
+            text = "".join(rng.choice(self.PIECES) for _ in range(rng.randint(0, 25)))
+            with self.subTest(text=text):
+                self.assert_same_output(text)
+
+class TestTextToTextnodesOffsets(unittest.TestCase):
+    """Test cases for nodes that keep offsets into their source."""
+
+    def test_nodes_refer_to_the_source(self):
+        """Test that nodes point at their slices of the source."""
+        text = "Some **bold** and [a link](https://example.com) and `code`"
+        nodes = text_to_textnodes(text, offsets=True)
+        self.assertTrue(all(isinstance(node, SourceTextNode) for node in nodes))
+        self.assertTrue(all(node.source is text for node in nodes))
+        spans = [(node.start, node.end) for node in nodes]
+        self.assertEqual(spans, [(0, 5), (7, 11), (13, 18), (19, 25), (47, 52), (53, 57)])
+        self.assertEqual(nodes[3].url, "https://example.com")
+
+    def test_image_alt_offsets(self):
+        """Test that an image's offsets cover its alt text."""
+        text = "An ![alt text](pic.png) here"
+        image = text_to_textnodes(text, offsets=True)[1]
+        self.assertEqual((image.start, image.end), (5, 13))
+        self.assertEqual(image, TextNode("alt text", TextType.IMAGE, "pic.png"))
+
+    def test_renders_like_copied_nodes(self):
+        """Test that offset nodes render like copied ones."""
+        text = "**bold** _it_ ![a](b) [c](d) `e` plain"
+        copied = [text_node_to_html_node(node).to_html() for node in text_to_textnodes(text)]
+        offset = [text_node_to_html_node(node).to_html() for node in text_to_textnodes(text, offsets=True)]
+        self.assertEqual(offset, copied)
+
+class TestTextToTextnodesColumnar(unittest.TestCase):
+    """Test cases for the columnar TextNodeArray form."""
+
+    def test_returns_text_node_array(self):
+        """Test that nodes are stored as offsets and url indices."""
+        text = "Some **bold** and [a link](https://example.com) and `code`"
+        nodes = text_to_textnodes(text, columnar=True)
+        self.assertIsInstance(nodes, TextNodeArray)
+        self.assertIs(nodes.source, text)
+        self.assertEqual(list(zip(nodes.starts, nodes.ends)), [(0, 5), (7, 11), (13, 18), (19, 25), (47, 52), (53, 57)])
+        self.assertEqual(nodes.urls, ["https://example.com"])
+
+    def test_renders_like_list_form(self):
+        """Test that it renders like the list of nodes."""
+        text = "a < **b & c** _it_ ![a](b?x&y) [c](d) `<e>` plain"
+        self.assertEqual(text_nodes_to_html(text_to_textnodes(text, columnar=True)),
+                         text_nodes_to_html(text_to_textnodes(text)))
+
+class TestMarkdownToHtmlNode(unittest.TestCase):
+    """Test cases for converting a whole document to an HTML tree."""
+
+    def test_paragraphs(self):
+        """Test paragraphs with inline markdown."""
+        md = """
+This is **bolded** paragraph
+text in a p
+tag here
+
+This is another paragraph with _italic_ text and `code` here
+
+"""
+        html = markdown_to_html_node(md).to_html()
+        self.assertEqual(
+            html,
+            "<div><p>This is <b>bolded</b> paragraph text in a p tag here</p><p>This is another paragraph with <i>italic</i> text and <code>code</code> here</p></div>",
+        )
+
+    def test_codeblock(self):
+        """Test that code block content is kept as written."""
+        md = "```\nThis is text that _should_ remain\nthe **same** even with inline stuff\n```"
+        html = markdown_to_html_node(md).to_html()
+        self.assertEqual(
+            html,
+            "<div><pre><code>This is text that _should_ remain\nthe **same** even with inline stuff\n</code></pre></div>",
+        )
+
+    def test_headings_quotes_and_lists(self):
+        """Test headings, quotes and both kinds of list."""
+        md = "## Title with [link](https://example.com)\n\n> quoted\n> text\n\n- one\n- **two**\n\n1. first\n2. second"
+        html = markdown_to_html_node(md).to_html()
+        self.assertEqual(
+            html,
+            '<div><h2>Title with <a href="https://example.com">link</a></h2>'
+            "<blockquote>quoted text</blockquote>"
+            "<ul><li>one</li><li><b>two</b></li></ul>"
+            "<ol><li>first</li><li>second</li></ol></div>",
+        )
+
+    def test_images_render(self):
+        """Test that images render as img tags."""
+        html = markdown_to_html_node("Look ![a cat](cat.png) here").to_html()
+        self.assertEqual(html, '<div><p>Look <img src="cat.png" alt="a cat"> here</p></div>')
+
+
+class TestRenderBlock(unittest.TestCase):
+    """Test cases for rendering blocks straight to HTML."""
+
+    BLOCKS = [
+        "### Heading with `code`",
+        "```\ncode <b> here\n```",
+        "> quoted **bold**\n> more",
+        "- one\n- _two_\n- [three](3.html)",
+        "1. one\n2. ![two](2.png)",
+        "A paragraph\nover two lines",
+    ]
+
+    def test_matches_node_rendering(self):
+        """Test that each block type renders like its HTML tree."""
+        for block in self.BLOCKS:
+            with self.subTest(block=block):
+                self.assertEqual(render_block(block), block_to_html_node(block).to_html())
+
+    def test_leaves_of_clean_blocks_are_marked_clean(self):
+        """Test that only leaves of blocks without special characters are marked clean."""
+        clean = block_to_html_node("- one **two**\n- [three](3.html)")
+        dirty = block_to_html_node("- one **two**\n- [three & four](3.html)")
+        leaves = lambda node: [leaf for item in node.children for leaf in item.children]
+        self.assertTrue(all(leaf.html_cache is leaf.value for leaf in leaves(clean)))
+        self.assertTrue(all(leaf.html_cache is None for leaf in leaves(dirty)))
+        self.assertEqual(dirty.to_html(), '<ul><li>one <b>two</b></li><li><a href="3.html">three &amp; four</a></li></ul>')
+
+    def test_code_is_escaped(self):
+        """Test that code block content is escaped."""
+        self.assertEqual(render_block("```\nif a < b && c:\n```"), "<pre><code>if a &lt; b &amp;&amp; c:\n</code></pre>")
+
+    def test_no_inline_nodes(self):
+        """Test that no inline nodes render to an empty string."""
+        self.assertEqual(inline_html([]), "")
+
+    def test_empty_elements(self):
+        """Test blocks whose elements have no content."""
+        for block, expected in [
+            (">", "<blockquote></blockquote>"),
+            ("- one\n- \n- three", "<ul><li>one</li><li></li><li>three</li></ul>"),
+            ("1. \n2. two", "<ol><li></li><li>two</li></ol>"),
+            ("# ``", "<h1></h1>"),
+            ("``", "<p></p>"),
+        ]:
+            with self.subTest(block=block):
+                self.assertEqual(render_block(block), expected)
+                self.assertEqual(block_to_html_node(block).to_html(), expected)
+
+    def test_empty_document(self):
+        """Test that a document with no blocks renders an empty div."""
+        for markdown in ("", "\n\n  \n"):
+            with self.subTest(markdown=markdown):
+                self.assertEqual(markdown_to_html(markdown), "<div></div>")
+                self.assertEqual(markdown_to_html_node(markdown).to_html(), "<div></div>")
+
+class TestCodeBlocks(unittest.TestCase):
+    """Test cases for fenced code blocks."""
+
+    def test_span_skips_fence_lines(self):
+        """Test that the code span leaves out the fence lines."""
+        block = "```python\nx = 1\ny = 2\n```"
+        self.assertEqual(code_block_span(block), (10, 21))
+        self.assertEqual(code_block_text(block), "x = 1\ny = 2\n")
+
+    def test_span_rejects_non_code(self):
+        """Test that blocks that are not fenced code have no span."""
+        for block in ("```\n```", "```\n```\n", "```code```", "```\ncode", "``\ncode\n```", "```\ncode\n```x", "text"):
+            with self.subTest(block=block):
+                self.assertIsNone(code_block_span(block))
+                with self.assertRaises(ValueError):
+                    code_block_text(block)
+
+    def test_whitespace_after_closing_fence(self):
+        """Test whitespace after the closing fence."""
+        for block in ("```\ncode\n```\n", "```\ncode\n```  \n", "```\ncode\n  ```\t\n\n"):
+            with self.subTest(block=block):
+                self.assertEqual(block_to_block_type(block), BlockType.CODE)
+                self.assertEqual(code_block_text(block), "code\n")
+                self.assertEqual(render_block(block), "<pre><code>code\n</code></pre>")
+
+    def test_has_no_inline_texts(self):
+        """Test that code blocks have no inline markdown."""
+        block = "```\n**not bold** [not](a link)\n```"
+        self.assertEqual(block_inline_texts(block, BlockType.CODE), [])
+
+    def test_large_block_matches_line_splitting(self):
+        """Test a large block against splitting it into lines."""
+        lines = [f"line {i} <tag attr=\"{i}\"> & **stars** _under_ `tick`" for i in range(20000)]
+        block = "```yaml\n" + "\n".join(lines) + "\n```"
+        self.assertEqual(block_to_block_type(block), BlockType.CODE)
+        code = "\n".join(block.splitlines()[1:-1]) + "\n"
+        self.assertEqual(code_block_text(block), code)
+        escaped = code.replace("&", "&amp;").replace("<", "&lt;").replace(">", "&gt;").replace('"', "&quot;")
+        expected = f"<pre><code>{escaped}</code></pre>"
+        self.assertEqual(render_block(block), expected)
+        self.assertEqual(block_to_html_node(block).to_html(), expected)
+
+    def test_other_line_breaks_are_kept(self):
+        """Test that line breaks other than newlines stay in the code."""
+        block = "```\nsection one\x0csection two\n```"
+        self.assertEqual(render_block(block), "<pre><code>section one\x0csection two\n</code></pre>")
+
+class TestBlockCache(unittest.TestCase):
+    """Test cases for caching built and rendered blocks."""
+
+    def test_repeated_blocks_hit_cache(self):
+        """Test that a block shared by two pages is built once."""
+        cache = BlockCache()
+        footer = "Licensed under **MIT**"
+        first = markdown_to_html_node(f"# Page one\n\n{footer}", cache)
+        second = markdown_to_html_node(f"# Page two\n\n{footer}", cache)
+        self.assertIs(first.children[1], second.children[1])
+        self.assertEqual(cache.stats(), {"hits": 1, "misses": 3, "hit_rate": 0.25, "size": 3, "max_blocks": 4096, "bytes": len(footer) + 2 * len("# Page one"), "max_bytes": 64 * 1024 * 1024})
+
+    def test_cached_output_matches_uncached(self):
+        """Test that caching does not change the output."""
+        cache = BlockCache()
+        md = "# Title\n\nSome _text_\n\n- a\n- b\n\nSome _text_"
+        self.assertEqual(markdown_to_html_node(md, cache).to_html(), markdown_to_html_node(md).to_html())
+        self.assertEqual(cache.hits, 1)
+
+    def test_least_recently_used_block_evicted(self):
+        """Test that the least recently used entry goes first."""
+        cache = BlockCache(max_blocks=2)
+        cache.get_html_node("one")
+        cache.get_html_node("two")
+        cache.get_html_node("one")
+        cache.get_html_node("three")
+        cache.get_html_node("one")
+        cache.get_html_node("three")
+        self.assertEqual((cache.hits, cache.misses), (3, 3))
+        cache.get_html_node("two")
+        self.assertEqual(cache.misses, 4)
+        self.assertEqual(len(cache.entries), cache.max_blocks)
+
+    def test_evicted_to_stay_under_byte_limit(self):
+        """Test eviction to stay within max_bytes."""
+        # "<p>aaaa</p>" counts 11, so only one rendered block fits.
+        cache = BlockCache(max_bytes=20)
+        cache.get_html("aaaa")
+        cache.get_html("bbbb")
+        self.assertEqual(cache.stats()["size"], 1)
+        self.assertLessEqual(cache.bytes, cache.max_bytes)
+        cache.get_html("aaaa")
+        self.assertEqual(cache.misses, 3)
+
+    def test_oversized_block_not_kept(self):
+        """Test that an entry bigger than max_bytes is not cached."""
+        cache = BlockCache(max_bytes=10)
+        self.assertEqual(cache.get_html("x" * 20), "<p>" + "x" * 20 + "</p>")
+        self.assertEqual((len(cache.entries), cache.bytes), (0, 0))
+
+    def test_entries_keyed_by_digest(self):
+        """Test that entries are keyed by a digest, not the block text."""
+        cache = BlockCache()
+        block = "a long paragraph " * 100
+        cache.get_html_node(block)
+        cache.get_html(block)
+        self.assertEqual(len(cache.entries), 2)
+        self.assertTrue(all(len(key) < 20 for key in cache.entries))
+
+    def test_hit_rate_with_no_lookups(self):
+        """Test the hit rate before any lookups."""
+        self.assertEqual(BlockCache().hit_rate(), 0.0)
+
+    def test_rendered_blocks_are_reused(self):
+        """Test that only edited blocks are rendered again."""
+        cache = BlockCache()
+        md = "# Title\n\nFirst _para_\n\n- a\n- b"
+        self.assertEqual(markdown_to_html(md, cache), markdown_to_html_node(md).to_html())
+        edited = md.replace("First", "Edited")
+        self.assertEqual(markdown_to_html(edited, cache), markdown_to_html_node(edited).to_html())
+        self.assertEqual((cache.hits, cache.misses), (2, 4))
+
+    def test_rendering_empty_document(self):
+        """Test rendering an empty document through the cache."""
+        self.assertEqual(markdown_to_html("", BlockCache()), "<div></div>")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,106 @@
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+import parse_cache
+from htmlnode import LeafNode, ParentNode, RawHTMLNode
+from markdown_parser import markdown_to_html, markdown_to_html_node, parse_document, render_parsed
+from parse_cache import ParseCache, node_from_tuple, node_to_tuple, parsed_from_tuple, parsed_to_tuple
+
+MARKDOWN = """# Title with `code`
+
+A **bold** and _italic_ [link](https://example.com?a=1&b=2) with ![img](/i.png)
+
+> quoted <text>
+
+```
+x < y
+```
+
+- one
+- two
+
+1. first
+2. second"""
+
+
+class TestTuples(unittest.TestCase):
+    def test_parsed_roundtrip(self):
+        parsed = parse_document(MARKDOWN)
+        self.assertEqual(parsed_from_tuple(parsed_to_tuple(parsed)), parsed)
+
+    def test_render_parsed_matches_markdown_to_html(self):
+        self.assertEqual(render_parsed(parse_document(MARKDOWN)), markdown_to_html(MARKDOWN))
+
+    def test_tree_roundtrip(self):
+        node = markdown_to_html_node(MARKDOWN)
+        restored = node_from_tuple(node_to_tuple(node))
+        self.assertEqual(repr(restored), repr(node))
+        self.assertEqual(restored.to_html(), node.to_html())
+
+    def test_node_kinds_roundtrip(self):
+        node = ParentNode("nav", [LeafNode("a", "Home", {"href": "/"}), RawHTMLNode("<hr>")], {"id": "x"}, memoize=True)
+        restored = node_from_tuple(node_to_tuple(node))
+        self.assertEqual(restored.to_html(), node.to_html())
+        self.assertIsNotNone(restored.html_cache)
+
+    def test_unknown_node_kind(self):
+        with self.assertRaises(ValueError):
+            node_from_tuple((9, "p"))
+
+
+class TestParseCache(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.cache = ParseCache(self.tmp.name)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_miss_then_hit(self):
+        first = self.cache.get_parsed(MARKDOWN)
+        second = ParseCache(self.tmp.name)
+        self.assertEqual(second.get_parsed(MARKDOWN), first)
+        self.assertEqual(self.cache.stats(), {"hits": 0, "misses": 1})
+        self.assertEqual(second.stats(), {"hits": 1, "misses": 0})
+
+    def test_tree_miss_then_hit(self):
+        first = self.cache.get_html_node(MARKDOWN)
+        self.assertEqual(self.cache.get_html_node(MARKDOWN).to_html(), first.to_html())
+        self.assertEqual(self.cache.stats(), {"hits": 1, "misses": 1})
+
+    def test_kinds_are_kept_apart(self):
+        self.cache.get_parsed(MARKDOWN)
+        self.cache.get_html_node(MARKDOWN)
+        self.assertEqual(self.cache.stats(), {"hits": 0, "misses": 2})
+
+    def test_edited_markdown_misses(self):
+        self.cache.get_parsed(MARKDOWN)
+        self.assertEqual(render_parsed(self.cache.get_parsed(MARKDOWN + " more")), markdown_to_html(MARKDOWN + " more"))
+        self.assertEqual(self.cache.stats(), {"hits": 0, "misses": 2})
+
+    def test_parser_version_change_misses(self):
+        self.cache.get_parsed(MARKDOWN)
+        with mock.patch.object(parse_cache, "PARSER_VERSION", parse_cache.PARSER_VERSION + 1):
+            self.cache.get_parsed(MARKDOWN)
+        self.assertEqual(self.cache.stats(), {"hits": 0, "misses": 2})
+
+    def test_corrupt_entry_is_replaced(self):
+        path = self.cache.entry_path("parsed", MARKDOWN)
+        os.makedirs(os.path.dirname(path))
+        with open(path, "wb") as f:
+            f.write(b"\x00garbage")
+        self.assertEqual(self.cache.get_parsed(MARKDOWN), parse_document(MARKDOWN))
+        self.assertEqual(ParseCache(self.tmp.name).get_parsed(MARKDOWN), parse_document(MARKDOWN))
+        self.assertEqual(self.cache.stats(), {"hits": 0, "misses": 1})
+
+    def test_no_temp_files_left(self):
+        self.cache.get_parsed(MARKDOWN)
+        names = [name for _, _, files in os.walk(self.tmp.name) for name in files]
+        self.assertEqual(len(names), 1)
+        self.assertFalse(names[0].endswith(".tmp"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,56 @@
+import unittest
+
+import markdown_parser
+from htmlnode import HTMLNode
+from markdown_parser import markdown_to_html_node
+from profiling import Profile
+
+
+class TestProfile(unittest.TestCase):
+    def test_records_stages(self):
+        md = "# Title\n\nSome **bold** and [a link](https://example.com)\n\n- one\n- two"
+        with Profile() as profile:
+            markdown_to_html_node(md).to_html()
+
+        calls, seconds, produced = profile.stats["markdown_to_blocks"]
+        self.assertEqual((calls, produced), (1, 3))
+        self.assertGreaterEqual(seconds, 0.0)
+        self.assertEqual(profile.stats["block_to_block_type"][0], 3)
+        self.assertEqual(profile.stats["text_to_textnodes"][0], 4)
+        self.assertEqual(profile.stats["text_to_textnodes"][2], 7)
+        # Inclusive: the links stage also counts the emphasis nodes it led to.
+        self.assertEqual(profile.stats["text_to_textnodes: links"][2], 7)
+        self.assertEqual(profile.stats["text_to_textnodes: emphasis"][2], 6)
+        self.assertEqual(profile.stats["to_html (chars)"][0], 1)
+
+    def test_counts_columnar_nodes(self):
+        with Profile() as profile:
+            nodes = markdown_parser.text_to_textnodes("a **b** [c](d) `e` ![f](g)", columnar=True)
+        self.assertEqual(len(nodes), 8)
+        self.assertEqual(profile.stats["text_to_textnodes: images"][2], 7)
+        self.assertEqual(profile.stats["text_to_textnodes: emphasis"][2], 5)
+
+    def test_originals_restored_on_exit(self):
+        original = markdown_parser.text_to_textnodes
+        original_to_html = HTMLNode.to_html
+        with Profile():
+            self.assertIsNot(markdown_parser.text_to_textnodes, original)
+        self.assertIs(markdown_parser.text_to_textnodes, original)
+        self.assertIs(HTMLNode.to_html, original_to_html)
+        self.assertIsNone(Profile.active)
+
+    def test_only_one_active_profile(self):
+        with Profile():
+            with self.assertRaises(RuntimeError):
+                Profile().__enter__()
+
+    def test_report_lists_called_stages(self):
+        with Profile() as profile:
+            markdown_to_html_node("Just _text_").to_html()
+        report = profile.report()
+        self.assertIn("text_to_textnodes", report)
+        self.assertNotIn("split_nodes_link", report)
+
+
+if __name__ == "__main__":
+    unittest.main()
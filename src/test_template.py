@@ -0,0 +1,153 @@
+import io
+import os
+import pickle
+import tempfile
+import unittest
+
+from htmlnode import LeafNode, ParentNode, RawHTMLNode
+from template import (
+    CompiledTemplate,
+    TemplateCache,
+    extract_title,
+    load_template,
+    render_template,
+    split_front_matter,
+)
+
+
+class TestFrontMatter(unittest.TestCase):
+    def test_no_front_matter(self):
+        self.assertEqual(split_front_matter("# Title\n\nBody"), ({}, "# Title\n\nBody"))
+
+    def test_front_matter_is_split_off(self):
+        meta, body = split_front_matter("---\nlayout: post.html\nauthor : Sam\n---\n# Title")
+        self.assertEqual(meta, {"layout": "post.html", "author": "Sam"})
+        self.assertEqual(body, "# Title")
+
+    def test_unclosed_front_matter_is_body(self):
+        self.assertEqual(split_front_matter("---\nlayout: post.html"), ({}, "---\nlayout: post.html"))
+
+    def test_crlf_front_matter(self):
+        meta, body = split_front_matter("---\r\nlayout: post.html\r\n---\r\n# Title\r\n")
+        self.assertEqual(meta, {"layout": "post.html"})
+        self.assertEqual(body, "# Title\n")
+
+    def test_closing_fence_at_end_of_file(self):
+        self.assertEqual(split_front_matter("---\nlayout: post.html\n---"), ({"layout": "post.html"}, ""))
+        self.assertEqual(split_front_matter("---\r\nlayout: post.html\r\n---"), ({"layout": "post.html"}, ""))
+
+
+class TestExtractTitle(unittest.TestCase):
+    def test_first_h1(self):
+        self.assertEqual(extract_title("Intro\n\n## Sub\n\n# Main Title \n\n# Second"), "Main Title")
+
+    def test_no_title(self):
+        self.assertIsNone(extract_title("## Only a subheading"))
+
+
+class TestTemplates(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.templates_dir = self.tmp.name
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def write_template(self, name, text):
+        path = os.path.join(self.templates_dir, name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(text)
+
+    def test_includes_are_expanded_and_recorded(self):
+        self.write_template("template.html", "<html>{{> partials/nav.html }}{{ Content }}</html>")
+        self.write_template("partials/nav.html", "<nav>{{>partials/logo.html}}</nav>")
+        self.write_template("partials/logo.html", "<img>")
+        used = []
+        template = load_template(self.templates_dir, "template.html", used)
+        self.assertEqual(template, "<html><nav><img></nav>{{ Content }}</html>")
+        self.assertEqual(used, ["template.html", "partials/nav.html", "partials/logo.html"])
+
+    def test_include_cycle_raises(self):
+        self.write_template("a.html", "{{> b.html }}")
+        self.write_template("b.html", "{{> a.html }}")
+        with self.assertRaises(ValueError):
+            load_template(self.templates_dir, "a.html", [])
+
+    def test_render_template(self):
+        html = render_template("<title>{{ Title }}</title><main>{{ Content }}</main>", "Home", "<p>hi</p>")
+        self.assertEqual(html, "<title>Home</title><main><p>hi</p></main>")
+
+    def test_cache_compiles_each_template_once(self):
+        self.write_template("template.html", "<html>{{> nav.html }}{{ Content }}</html>")
+        self.write_template("nav.html", "<nav>{{ Title }}</nav>")
+        cache = TemplateCache(self.templates_dir)
+        template, used = cache.get("template.html")
+        self.assertEqual(used, ("template.html", "nav.html"))
+        self.assertIs(cache.get("template.html")[0], template)
+        self.assertEqual(template.render({"Title": "Home", "Content": "<p>hi</p>"}), "<html><nav>Home</nav><p>hi</p></html>")
+
+    def test_preload_skips_include_cycles(self):
+        self.write_template("template.html", "{{ Content }}")
+        self.write_template("a.html", "{{> b.html }}")
+        self.write_template("b.html", "{{> a.html }}")
+        cache = TemplateCache(self.templates_dir).preload()
+        self.assertEqual(list(cache.templates), ["template.html"])
+        with self.assertRaises(ValueError):
+            cache.get("a.html")
+
+    def test_preload_skips_missing_includes(self):
+        self.write_template("template.html", "{{ Content }}")
+        self.write_template("partials/broken.html", "{{> missing.html }}")
+        cache = TemplateCache(self.templates_dir).preload()
+        self.assertEqual(list(cache.templates), ["template.html"])
+        with self.assertRaises(FileNotFoundError):
+            cache.get("partials/broken.html")
+
+    def test_preloaded_cache_pickles(self):
+        self.write_template("template.html", "<b>{{ Title }}</b>{{ Content }}")
+        cache = pickle.loads(pickle.dumps(TemplateCache(self.templates_dir).preload()))
+        template, used = cache.get("template.html")
+        self.assertEqual(used, ("template.html",))
+        self.assertEqual(template.render({"Title": "T", "Content": "C"}), "<b>T</b>C")
+
+
+class TestCompiledTemplate(unittest.TestCase):
+    def test_segments_and_slots(self):
+        template = CompiledTemplate("<title>{{ Title }}</title>{{ Content }}<footer>{{ Unknown }}</footer>")
+        self.assertEqual(template.segments, ["<title>", "</title>", "<footer>{{ Unknown }}</footer>"])
+        self.assertEqual(template.slots, ["Title", "Content"])
+
+    def test_no_slots(self):
+        template = CompiledTemplate("<p>static</p>")
+        self.assertEqual(template.render({}), "<p>static</p>")
+
+    def test_values_are_not_searched_for_placeholders(self):
+        template = CompiledTemplate("<h1>{{ Title }}</h1>{{ Content }}")
+        html = template.render({"Title": "About {{ Content }}", "Content": "<p>body</p>"})
+        self.assertEqual(html, "<h1>About {{ Content }}</h1><p>body</p>")
+
+    def test_repeated_slot(self):
+        template = CompiledTemplate("{{ Title }}|{{ Title }}")
+        self.assertEqual(template.render({"Title": "x"}), "x|x")
+
+    def test_streams_nodes(self):
+        template = CompiledTemplate("<main>{{ Content }}</main><i>{{ Title }}</i>")
+        content = ParentNode("div", [LeafNode("b", "bold"), LeafNode(None, " text")])
+        values = {"Title": "Home", "Content": content}
+        out = io.StringIO()
+        template.write(out, values)
+        self.assertEqual(out.getvalue(), "<main><div><b>bold</b> text</div></main><i>Home</i>")
+        self.assertEqual(template.render(values), out.getvalue())
+
+    def test_raw_fragment_slot(self):
+        template = CompiledTemplate("<main>{{ Content }}</main>")
+        values = {"Content": RawHTMLNode(b"<div><p>cached</p></div>")}
+        out = io.StringIO()
+        template.write(out, values)
+        self.assertEqual(out.getvalue(), "<main><div><p>cached</p></div></main>")
+        self.assertEqual(template.render(values), out.getvalue())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,6 +1,17 @@
+import io
+import struct
+import sys
 import unittest
 
-from textnode import TextNode, TextType, text_node_to_html_node
+from textnode import (
+    SourceTextNode,
+    TextNode,
+    TextNodeArray,
+    TextType,
+    text_node_to_html_node,
+    text_nodes_to_html,
+    write_text_nodes,
+)
 
 
 class TestTextNode(unittest.TestCase):
@@ -142,6 +153,191 @@ class TestTextNodeToHtmlNode(unittest.TestCase):
             text_node_to_html_node(node)
         self.assertIn("Text Type requested not permitted", str(context.exception))
 
+class TestTextNodeSlots(unittest.TestCase):
+    """Test cases for the compact slotted TextNode layout."""
+
+    def test_no_instance_dict(self):
+        """Test that TextNode stores its fields in slots."""
+        node = TextNode("Slotted", TextType.TEXT)
+        self.assertFalse(hasattr(node, "__dict__"))
+
+    def test_hash_matches_equality(self):
+        """Test that equal TextNodes hash the same."""
+        node = TextNode("Link", TextType.LINK, "https://example.com")
+        node2 = TextNode("Link", TextType.LINK, "https://example.com")
+        self.assertEqual(len({node, node2}), 1)
+
+class TestSourceTextNode(unittest.TestCase):
+    """Test cases for TextNodes that refer to a slice of their source."""
+
+    def test_text_is_sliced_from_source(self):
+        """Test that the text is the referenced slice of the source."""
+        node = SourceTextNode("Hello **world**!", 8, 13, TextType.BOLD)
+        self.assertEqual(node.text, "world")
+        self.assertEqual((node.start, node.end), (8, 13))
+
+    def test_equals_copied_node(self):
+        """Test equality and hashing against a TextNode with the same text."""
+        node = SourceTextNode("see [docs](https://example.com)", 5, 9, TextType.LINK, "https://example.com")
+        copied = TextNode("docs", TextType.LINK, "https://example.com")
+        self.assertEqual(node, copied)
+        self.assertEqual(copied, node)
+        self.assertEqual(hash(node), hash(copied))
+        self.assertEqual(len({node, copied}), 1)
+        self.assertNotEqual(node, TextNode("docs", TextType.LINK, "https://example.org"))
+
+    def test_no_instance_dict(self):
+        """Test that SourceTextNode stores its fields in slots."""
+        node = SourceTextNode("text", 0, 4, TextType.TEXT)
+        self.assertFalse(hasattr(node, "__dict__"))
+
+    def test_no_text_slot(self):
+        """Test that it only adds its source and offsets to a TextNode's size."""
+        node = SourceTextNode("text", 0, 4, TextType.TEXT)
+        copied = TextNode("text", TextType.TEXT)
+        self.assertEqual(sys.getsizeof(node) - sys.getsizeof(copied), 2 * struct.calcsize("P"))
+
+    def test_conversion(self):
+        """Test that it converts to HTML like a TextNode."""
+        node = SourceTextNode("x ![alt](a.png)", 4, 7, TextType.IMAGE, "a.png")
+        self.assertEqual(text_node_to_html_node(node).to_html(), '<img src="a.png" alt="alt">')
+
+class TestTextNodesToHtml(unittest.TestCase):
+    """Test cases for rendering TextNodes without building LeafNodes."""
+
+    NODES = [
+        TextNode("plain ", TextType.TEXT),
+        TextNode("bold", TextType.BOLD),
+        TextNode("italic", TextType.ITALIC),
+        TextNode("x = 1", TextType.CODE),
+        TextNode("a link", TextType.LINK, "https://example.com?a=1&b=2"),
+        TextNode("", TextType.IMAGE, "pic.png"),
+        TextNode("alt text", TextType.IMAGE, "pic.png"),
+        SourceTextNode("see {braces}", 4, 12, TextType.TEXT),
+        TextNode("1 < 2 & \"quoted\"", TextType.ITALIC),
+        TextNode("<b> & co", TextType.LINK, '/q?a=1&b="2"'),
+        TextNode('alt "<x>"', TextType.IMAGE, "a&b.png"),
+    ]
+
+    def test_matches_leaf_nodes(self):
+        """Test that every text type renders like its LeafNode."""
+        expected = "".join(text_node_to_html_node(node).to_html() for node in self.NODES)
+        self.assertEqual(text_nodes_to_html(self.NODES), expected)
+
+    def test_escapes_text_and_urls(self):
+        """Test that text and urls are escaped."""
+        nodes = [TextNode("a < b", TextType.CODE), TextNode('"x" & y', TextType.LINK, "/?a=1&b=2")]
+        self.assertEqual(text_nodes_to_html(nodes), '<code>a &lt; b</code><a href="/?a=1&amp;b=2">&quot;x&quot; &amp; y</a>')
+
+    def test_stream(self):
+        """Test writing the same HTML to a stream."""
+        out = io.StringIO()
+        write_text_nodes(self.NODES, out)
+        self.assertEqual(out.getvalue(), text_nodes_to_html(self.NODES))
+
+    def test_non_string_urls(self):
+        """Test that a None or numeric url renders like its LeafNode does."""
+        nodes = [TextNode("a link", TextType.LINK, None), TextNode("alt", TextType.IMAGE, 3)]
+        expected = "".join(text_node_to_html_node(node).to_html() for node in nodes)
+        self.assertEqual(expected, '<a href="None">a link</a><img src="3" alt="alt">')
+        self.assertEqual(text_nodes_to_html(nodes), expected)
+        out = io.StringIO()
+        write_text_nodes(nodes, out)
+        self.assertEqual(out.getvalue(), expected)
+
+    def test_empty_list(self):
+        """Test that no nodes render to an empty string."""
+        self.assertEqual(text_nodes_to_html([]), "")
+
+    def test_invalid_type(self):
+        """Test that an unknown text type fails like text_node_to_html_node."""
+        node = TextNode("Invalid", "not a type")
+        for render in (text_nodes_to_html, lambda nodes: write_text_nodes(nodes, io.StringIO())):
+            with self.assertRaises(Exception) as context:
+                render([node])
+            self.assertIn("Text Type requested not permitted", str(context.exception))
+
+class TestTextNodeArray(unittest.TestCase):
+    """Test cases for TextNodes stored as parallel arrays."""
+
+    SOURCE = 'a & **b** [one](/1?x=1&y=2) [two](/2) [again](/1?x=1&y=2) ![alt "q"](p.png) `<c>`'
+
+    def make_array(self):
+        nodes = TextNodeArray(self.SOURCE)
+        nodes.add(self.SOURCE, 0, 4, TextType.TEXT, None)
+        nodes.add(self.SOURCE, 6, 7, TextType.BOLD, None)
+        nodes.add(self.SOURCE, 11, 14, TextType.LINK, "/1?x=1&y=2")
+        nodes.add(self.SOURCE, 29, 32, TextType.LINK, "/2")
+        nodes.add(self.SOURCE, 39, 44, TextType.LINK, "/1?x=1&y=2")
+        nodes.add(self.SOURCE, 60, 67, TextType.IMAGE, "p.png")
+        nodes.add(self.SOURCE, 77, 80, TextType.CODE, None)
+        return nodes
+
+    EXPECTED = [
+        TextNode("a & ", TextType.TEXT),
+        TextNode("b", TextType.BOLD),
+        TextNode("one", TextType.LINK, "/1?x=1&y=2"),
+        TextNode("two", TextType.LINK, "/2"),
+        TextNode("again", TextType.LINK, "/1?x=1&y=2"),
+        TextNode('alt "q"', TextType.IMAGE, "p.png"),
+        TextNode("<c>", TextType.CODE),
+    ]
+
+    def test_iterates_as_source_text_nodes(self):
+        """Test that iteration gives SourceTextNode views of the source."""
+        nodes = list(self.make_array())
+        self.assertTrue(all(isinstance(node, SourceTextNode) and node.source is self.SOURCE for node in nodes))
+        self.assertEqual(nodes, self.EXPECTED)
+
+    def test_indexing(self):
+        """Test indexing, negative indexing and slicing."""
+        nodes = self.make_array()
+        self.assertEqual(len(nodes), 7)
+        self.assertEqual(nodes[2], self.EXPECTED[2])
+        self.assertEqual(nodes[-1], self.EXPECTED[-1])
+        self.assertEqual(nodes[1:3], self.EXPECTED[1:3])
+        with self.assertRaises(IndexError):
+            nodes[7]
+
+    def test_equals_list_form(self):
+        """Test equality with lists and other arrays, both ways round."""
+        nodes = self.make_array()
+        self.assertEqual(nodes, self.EXPECTED)
+        self.assertEqual(self.EXPECTED, nodes)
+        self.assertEqual(nodes, self.make_array())
+        self.assertNotEqual(nodes, self.EXPECTED[:-1])
+        self.assertNotEqual(nodes, self.EXPECTED[:-1] + [TextNode("<c>", TextType.TEXT)])
+        self.assertNotEqual(nodes, "not nodes")
+
+    def test_urls_are_stored_once(self):
+        """Test that a repeated url is kept once and shared by index."""
+        nodes = self.make_array()
+        self.assertEqual(nodes.urls, ["/1?x=1&y=2", "/2", "p.png"])
+        self.assertEqual(list(nodes.url_indices), [-1, -1, 0, 1, 0, 2, -1])
+
+    def test_renders_like_list_form(self):
+        """Test that rendering matches text_nodes_to_html of the list."""
+        nodes = self.make_array()
+        for escape in (True, False):
+            self.assertEqual(text_nodes_to_html(nodes, escape), text_nodes_to_html(self.EXPECTED, escape))
+        stream = io.StringIO()
+        write_text_nodes(nodes, stream)
+        self.assertEqual(stream.getvalue(), text_nodes_to_html(self.EXPECTED))
+
+    def test_clean_source_renders_unescaped(self):
+        """Test rendering when the source has nothing to escape."""
+        source = "plain **bold** [x](/y)"
+        nodes = TextNodeArray(source)
+        nodes.add(source, 0, 6, TextType.TEXT, None)
+        nodes.add(source, 8, 12, TextType.BOLD, None)
+        nodes.add(source, 16, 17, TextType.LINK, "/y")
+        self.assertEqual(nodes.to_html(), 'plain <b>bold</b><a href="/y">x</a>')
+
+    def test_empty(self):
+        """Test that an empty array renders to an empty string."""
+        self.assertEqual(TextNodeArray("").to_html(), "")
+        self.assertEqual(TextNodeArray(""), [])
+
 
 if __name__ == "__main__":
     unittest.main()
\ No newline at end of file
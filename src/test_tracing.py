@@ -0,0 +1,52 @@
+import json
+import os
+import tempfile
+import unittest
+
+from tracing import Tracer
+
+
+class TestTracer(unittest.TestCase):
+    def test_span_records_complete_event(self):
+        tracer = Tracer()
+        with tracer.span("render", page="index.md"):
+            pass
+        self.assertEqual(len(tracer.events), 1)
+        event = tracer.events[0]
+        self.assertEqual(event["name"], "render")
+        self.assertEqual(event["ph"], "X")
+        self.assertEqual(event["pid"], os.getpid())
+        self.assertEqual(event["args"], {"page": "index.md"})
+        self.assertGreaterEqual(event["dur"], 0)
+
+    def test_nested_spans_are_contained(self):
+        tracer = Tracer()
+        with tracer.span("page"):
+            with tracer.span("read"):
+                pass
+        read, page = tracer.events
+        self.assertLessEqual(page["ts"], read["ts"])
+        self.assertGreaterEqual(page["ts"] + page["dur"], read["ts"] + read["dur"])
+
+    def test_disabled_tracer_records_nothing(self):
+        tracer = Tracer(enabled=False)
+        with tracer.span("page"):
+            pass
+        self.assertEqual(tracer.events, [])
+
+    def test_write_names_processes(self):
+        tracer = Tracer()
+        with tracer.span("write"):
+            pass
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "trace.json")
+            tracer.write(path)
+            with open(path, encoding="utf-8") as f:
+                events = json.load(f)["traceEvents"]
+        self.assertEqual(events[0]["ph"], "M")
+        self.assertEqual(events[0]["args"], {"name": f"worker {os.getpid()}"})
+        self.assertEqual(events[1]["name"], "write")
+
+
+if __name__ == "__main__":
+    unittest.main()
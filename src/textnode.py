@@ -1,5 +1,6 @@
+from array import array
 from enum import Enum
-from htmlnode import LeafNode
+from htmlnode import LeafNode, escape_html, needs_escaping
 
 class TextType(Enum):
     TEXT = "text"
@@ -10,6 +11,8 @@ class TextType(Enum):
     IMAGE = "image"
 
 class TextNode():
+    __slots__ = ("text", "text_type", "url")
+
     def __init__(self, text, TextType, url = None):
         self.text = text
         self.text_type = TextType
@@ -27,6 +30,110 @@ class TextNode():
     def __repr__(self):
         return f"TextNode({self.text}, {self.text_type.value}, {self.url})"
     
+class SourceTextNode():
+    # A TextNode that refers to source[start:end] instead of holding a copy of
+    # it: the text is only sliced out when it is read, for example when the
+    # node is rendered. It compares and hashes like a TextNode with the same
+    # text. source is the inline text the node was parsed from, not the
+    # document, so start/end are offsets into that string only. It borrows
+    # TextNode's methods rather than subclassing it, which would also give
+    # it an unused slot for text.
+    __slots__ = ("source", "start", "end", "text_type", "url")
+
+    def __init__(self, source, start, end, TextType, url = None):
+        self.source = source
+        self.start = start
+        self.end = end
+        self.text_type = TextType
+        self.url = url
+
+    @property
+    def text(self):
+        return self.source[self.start:self.end]
+
+    __eq__ = TextNode.__eq__
+    __hash__ = TextNode.__hash__
+    __repr__ = TextNode.__repr__
+
+# TextTypes by their code, the index a TextNodeArray or the parse cache
+# stores in place of the enum member.
+TEXT_TYPES = tuple(TextType)
+TEXT_TYPE_CODES = {text_type: code for code, text_type in enumerate(TEXT_TYPES)}
+
+class TextNodeArray():
+    # The nodes text_to_textnodes(source) gives, stored as parallel arrays
+    # instead of one object per node: a type code, start and end offsets into
+    # source, and an index into urls (-1 for none) for each node, with every
+    # distinct url kept once. Indexing and iterating give SourceTextNode
+    # views, and it compares equal to a list of the same nodes.
+    __slots__ = ("source", "types", "starts", "ends", "url_indices", "urls", "url_codes")
+
+    def __init__(self, source):
+        self.source = source
+        self.types = array("B")
+        self.starts = array("q")
+        self.ends = array("q")
+        self.url_indices = array("i")
+        self.urls = []
+        # url -> its index in urls, made for the first url added.
+        self.url_codes = None
+
+    def add(self, source, start, end, text_type, url):
+        # Takes the same arguments as SourceTextNode, but source must be
+        # this array's source.
+        self.types.append(TEXT_TYPE_CODES[text_type])
+        self.starts.append(start)
+        self.ends.append(end)
+        if url is None:
+            self.url_indices.append(-1)
+            return
+        if self.url_codes is None:
+            self.url_codes = {}
+        index = self.url_codes.get(url)
+        if index is None:
+            index = self.url_codes[url] = len(self.urls)
+            self.urls.append(url)
+        self.url_indices.append(index)
+
+    def __len__(self):
+        return len(self.types)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        url_index = self.url_indices[index]
+        return SourceTextNode(self.source, self.starts[index], self.ends[index], TEXT_TYPES[self.types[index]],
+                              None if url_index < 0 else self.urls[url_index])
+
+    def __iter__(self):
+        source = self.source
+        urls = self.urls
+        for code, start, end, url_index in zip(self.types, self.starts, self.ends, self.url_indices):
+            yield SourceTextNode(source, start, end, TEXT_TYPES[code], None if url_index < 0 else urls[url_index])
+
+    def __eq__(self, other):
+        if not isinstance(other, (TextNodeArray, list)):
+            return NotImplemented
+        return len(self) == len(other) and all(node == other_node for node, other_node in zip(self, other))
+
+    def __repr__(self):
+        return f"TextNodeArray({list(self)})"
+
+    def to_html(self, escape=True):
+        # text_nodes_to_html(self), straight from the arrays. All the text is
+        # in source, so one check of it can rule out escaping every node.
+        source = self.source
+        templates = TEXT_NODE_HTML_BY_CODE
+        urls = [escape_html(url) if escape else url for url in self.urls]
+        # The None a url index of -1 picks.
+        urls.append(None)
+        nodes = zip(self.types, self.starts, self.ends, self.url_indices)
+        if escape and needs_escaping(source):
+            return "".join([templates[code].format(escape_html(source[start:end]), urls[url_index])
+                            for code, start, end, url_index in nodes])
+        return "".join([templates[code].format(source[start:end], urls[url_index])
+                        for code, start, end, url_index in nodes])
+
 def text_node_to_html_node(text_node):
     match text_node.text_type:
         case TextType.TEXT:
@@ -42,4 +149,40 @@ def text_node_to_html_node(text_node):
         case TextType.IMAGE:
             return LeafNode(tag="img", value="", props={"src": text_node.url, "alt": text_node.text})
         case _:
-            raise Exception("Text Type requested not permitted")
\ No newline at end of file
+            raise Exception("Text Type requested not permitted")
+
+# Fused rendering: per TextType, the HTML text_node_to_html_node(node).to_html()
+# would give, as a format string over the node's escaped text ({0}) and url
+# ({1}). It saves building a LeafNode and props dict for every inline node.
+# Callers that already know none of the text or urls need escaping, such as
+# when the whole source they came from is clean, can pass escape=False.
+TEXT_NODE_HTML = {
+    TextType.TEXT: "{0}",
+    TextType.BOLD: "<b>{0}</b>",
+    TextType.ITALIC: "<i>{0}</i>",
+    TextType.CODE: "<code>{0}</code>",
+    TextType.LINK: '<a href="{1}">{0}</a>',
+    TextType.IMAGE: '<img src="{1}" alt="{0}">',
+}
+TEXT_NODE_HTML_BY_CODE = tuple(TEXT_NODE_HTML[text_type] for text_type in TEXT_TYPES)
+
+def text_nodes_to_html(text_nodes, escape=True):
+    if isinstance(text_nodes, TextNodeArray):
+        return text_nodes.to_html(escape)
+    try:
+        if not escape:
+            return "".join([TEXT_NODE_HTML[node.text_type].format(node.text, node.url) for node in text_nodes])
+        return "".join([TEXT_NODE_HTML[node.text_type].format(escape_html(node.text), node.url and escape_html(node.url))
+                        for node in text_nodes])
+    except KeyError:
+        raise Exception("Text Type requested not permitted")
+
+def write_text_nodes(text_nodes, stream, escape=True):
+    for node in text_nodes:
+        template = TEXT_NODE_HTML.get(node.text_type)
+        if template is None:
+            raise Exception("Text Type requested not permitted")
+        if escape:
+            stream.write(template.format(escape_html(node.text), node.url and escape_html(node.url)))
+        else:
+            stream.write(template.format(node.text, node.url))
\ No newline at end of file
@@ -0,0 +1,46 @@
+import contextlib
+import json
+import os
+import time
+
+
+class Tracer():
+    # Collects Chrome trace-event "complete" spans (load the written file in
+    # chrome://tracing or Perfetto). Spans carry the PID of the process that
+    # recorded them, and perf_counter is system-wide, so events from pool
+    # workers line up on one timeline. A disabled tracer records nothing.
+    def __init__(self, enabled=True):
+        self.enabled = enabled
+        self.events = []
+
+    def span(self, name, **args):
+        if not self.enabled:
+            return contextlib.nullcontext()
+        return self.record(name, args)
+
+    @contextlib.contextmanager
+    def record(self, name, args):
+        start = time.perf_counter_ns()
+        try:
+            yield
+        finally:
+            end = time.perf_counter_ns()
+            pid = os.getpid()
+            self.events.append({
+                "name": name,
+                "ph": "X",
+                "ts": start / 1000,
+                "dur": (end - start) / 1000,
+                "pid": pid,
+                "tid": pid,
+                "args": args,
+            })
+
+    def write(self, path):
+        pids = sorted({event["pid"] for event in self.events})
+        metadata = [
+            {"name": "process_name", "ph": "M", "pid": pid, "tid": pid, "args": {"name": f"worker {pid}"}}
+            for pid in pids
+        ]
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({"traceEvents": metadata + self.events, "displayTimeUnit": "ms"}, f)